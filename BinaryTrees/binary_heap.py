@@ -13,68 +13,15 @@ A[Parent(i)] >= A[i] for all i > 1.
 - The height of a node of the tree is the number of edges in the longest path of the node downto a leaf of the tree.
 - The tree height is the height of the root node.
 - Since a heap induces a binary tree, its height is Θ(log n).
+
+The functions below do not draw anything. To trace them, pass an observer: a function
+called at every step as observer(A, title=..., current_node=..., changed_nodes=...).
+visualize_heap (heap_visualization.py) is such an observer, and HeapRecorder records
+the steps to replay them later.
 """
 
 import random
-import matplotlib.pyplot as plt
-import networkx as nx
-import imageio
-
 
-# ----------------------------------------------------
-# Visualize the heap using NetworkX and Matplotlib
-# ----------------------------------------------------
-def visualize_heap(A, title="", pause=1.0, current_node=None, changed_nodes=None):
-    G = nx.DiGraph()
-    labels = {}
-    
-    # Default values if not provided
-    if changed_nodes is None:
-        changed_nodes = []
-    
-    # Create nodes and edges
-    for i, value in enumerate(A):
-        labels[i] = str(value)
-        left = Left_Child(i)
-        right = Right_Child(i)
-        if left < len(A):
-            G.add_edge(i, left)
-        if right < len(A):
-            G.add_edge(i, right)
-    
-    pos = hierarchy_pos(G, 0)
-    
-    # Determine node colors
-    node_colors = []
-    for i in G.nodes():
-        if i == current_node:
-            node_colors.append('red')  # Current node being evaluated
-        elif i in changed_nodes:
-            node_colors.append('lightgreen')  # Nodes that were changed
-        else:
-            node_colors.append('lightblue')  # Default color
-    
-    plt.clf()
-    nx.draw(G, pos, with_labels=True, labels=labels, node_color=node_colors, 
-            node_size=1200, font_size=15)
-    plt.title(title, fontsize=16)
-    plt.pause(pause)
-
-def hierarchy_pos(G, root, width=1.0, vert_gap=0.2, vert_loc=0, xcenter=0.5):
-    def _hierarchy_pos(G, root, leftmost, width, vert_gap, vert_loc, xcenter, pos=None, parent=None):
-        if pos is None:
-            pos = {root: (xcenter, vert_loc)}
-        else:
-            pos[root] = (xcenter, vert_loc)
-        children = list(G.neighbors(root))
-        if children:
-            dx = width / len(children)
-            nextx = xcenter - width / 2 - dx / 2
-            for child in children:
-                nextx += dx
-                pos = _hierarchy_pos(G, child, leftmost, dx, vert_gap, vert_loc - vert_gap, nextx, pos, root)
-        return pos
-    return _hierarchy_pos(G, root, 0, width, vert_gap, vert_loc, xcenter)
 
 # ----------------------------------------------------
 # Binary Heap Functions
@@ -91,13 +38,31 @@ def Right_Child(i):
     """Return the index of the right child of the node at index i."""
     return 2 * i + 2
 
-def Max_Heapify(A, i, full_array=None):
-    """Ensure the subtree rooted at index i is a max heap."""
+class HeapRecorder:
+    """Observer that records a copy of the array and the highlighted nodes at every step."""
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, A, title="", current_node=None, changed_nodes=None):
+        self.events.append({
+            'array': list(A),
+            'title': title,
+            'current_node': current_node,
+            'changed_nodes': list(changed_nodes) if changed_nodes else [],
+        })
+
+def Max_Heapify(A, i, full_array=None, observer=None, heap_size=None):
+    """Ensure the subtree rooted at index i is a max heap.
+
+    Only A[:heap_size] (all of A by default) is part of the heap, so the heap can
+    shrink in place. full_array is the array reported to the observer."""
     if full_array is None:
         full_array = A
+    if heap_size is None:
+        heap_size = len(A)
     l = Left_Child(i)
     r = Right_Child(i)
-    n = len(A) - 1
+    n = heap_size - 1
     
     # Find the largest
     if l <= n and A[l] > A[i]:
@@ -114,37 +79,85 @@ def Max_Heapify(A, i, full_array=None):
         # Update the full array if we're working with a slice
         if full_array is not A:
             full_array[i], full_array[largest] = A[i], A[largest]
-        visualize_heap(full_array, title=f"Heapify at index {i}", 
-                      current_node=i, changed_nodes=[i, largest])
-        Max_Heapify(A, largest, full_array)
-    else:
-        visualize_heap(full_array, title=f"Heapify at index {i}", 
-                      current_node=i)
-
-def Build_Max_Heap(A):
+        if observer is not None:
+            observer(full_array, title=f"Heapify at index {i}", 
+                     current_node=i, changed_nodes=[i, largest])
+        Max_Heapify(A, largest, full_array, observer, heap_size)
+    elif observer is not None:
+        observer(full_array, title=f"Heapify at index {i}", 
+                 current_node=i)
+
+def Build_Max_Heap(A, observer=None):
     """Build a max heap from the given array."""
     # Start from the last non-leaf node and max-heapify each node
     for i in range(len(A) // 2 - 1, -1, -1):
-        visualize_heap(A, title=f"Building heap at index {i}", current_node=i)
-        Max_Heapify(A, i)
+        if observer is not None:
+            observer(A, title=f"Building heap at index {i}", current_node=i)
+        Max_Heapify(A, i, observer=observer)
 
-def Heapsort(A):
+def Heapsort(A, observer=None):
     """Sort the array A using heapsort."""
-    Build_Max_Heap(A)
+    Build_Max_Heap(A, observer)
     heap_size = len(A)
     
-    plt.figure()
     for i in range(heap_size-1, 0, -1):
         # Swap the root with the last element
         A[0], A[i] = A[i], A[0]
         
-        visualize_heap(A, title=f"Sorting - swapped {A[i]} with root", 
-                      current_node=0, changed_nodes=[0, i])
+        if observer is not None:
+            observer(A, title=f"Sorting - swapped {A[i]} with root", 
+                     current_node=0, changed_nodes=[0, i])
         
-        # Heapify the reduced heap but visualize the full array
-        temp_heap = A[:i]
-        Max_Heapify(temp_heap, 0, full_array=A)
-        A[:i] = temp_heap
+        # Heapify the reduced heap A[:i] in place
+        Max_Heapify(A, 0, observer=observer, heap_size=i)
+
+def Max_Heapify_Iterative(A, i, heap_size):
+    """Max_Heapify with a loop instead of recursion, on the heap A[:heap_size].
+
+    Instead of swapping at every level, the key of node i is held aside and the
+    larger children are moved up one level until the key's place is found."""
+    key = A[i]
+    while True:
+        l = Left_Child(i)
+        if l >= heap_size:
+            break
+        r = l + 1
+        largest = r if r < heap_size and A[r] > A[l] else l
+        if not A[largest] > key:
+            break
+        A[i] = A[largest]
+        i = largest
+    A[i] = key
+
+def Min_Heapify_Iterative(A, i, heap_size):
+    """Max_Heapify_Iterative for a min heap: the smallest key goes to the top."""
+    key = A[i]
+    while True:
+        l = Left_Child(i)
+        if l >= heap_size:
+            break
+        r = l + 1
+        smallest = r if r < heap_size and A[r] < A[l] else l
+        if not A[smallest] < key:
+            break
+        A[i] = A[smallest]
+        i = smallest
+    A[i] = key
+
+def Heapsort_In_Place(A):
+    """Sort the list or NumPy array A in place using heapsort.
+
+    The heap is the prefix A[:heap_size], so nothing is ever copied: O(n log n) time
+    and O(1) extra space. It does not report its steps to an observer."""
+    n = len(A)
+    for i in range(n // 2 - 1, -1, -1):
+        Max_Heapify_Iterative(A, i, n)
+
+    for heap_size in range(n - 1, 0, -1):
+        # Move the maximum behind the heap and heapify the reduced heap
+        A[0], A[heap_size] = A[heap_size], A[0]
+        Max_Heapify_Iterative(A, 0, heap_size)
+    return A
 
 
 if __name__ == "__main__":
@@ -155,8 +168,12 @@ if __name__ == "__main__":
     A = [random.randint(a, b) for _ in range(n)]
     print("Original array:", A)
 
+    import matplotlib.pyplot as plt
+    from heap_visualization import visualize_heap
+
     plt.ion()
-    Heapsort(A)
+    plt.figure()
+    Heapsort(A, observer=visualize_heap)
     plt.ioff()
     plt.show()
 
@@ -4,15 +4,18 @@ Binary Search Tree (BST) implementation in Python.
 BST is a data structure that maintains the order of elements.
 It allows for efficient searching, insertion, and deletion operations.
 A node contains a key, a left child, a right child, and a parent (null for the root node).
+Each node also stores the size of its subtree (the number of nodes in it, itself included),
+which gives order statistics (rank, select, range counts) in O(h) for a tree of height h.
 
 BST property:
 1. The left subtree of a node contains only nodes with keys less than or equal to the node's key.
 2. The right subtree of a node contains only nodes with keys greater than or equal to the node's key.
 """
 
+import os
 import random
-import matplotlib.pyplot as plt
-import networkx as nx
+import sys
+import numpy as np
 
 class Node:
     def __init__(self, key):
@@ -20,13 +23,16 @@ class Node:
         self.left = None
         self.right = None
         self.parent = None
+        self.size = 1  # number of nodes in the subtree rooted here
+
+def tree_size(node):
+    """Returns the number of nodes in the subtree rooted at node (0 for None)."""
+    return 0 if node is None else node.size
 
 def inorder_tree_walk(node):
     """Prints all the keys in the BST in sorted order."""
-    if node is not None:
-        inorder_tree_walk(node.left)
-        print(node.key, end=' ')
-        inorder_tree_walk(node.right)
+    for key in tree_items(node):
+        print(key, end=' ')
 
 def tree_search(node, key):
     """Returns a pointer to a node with key k if one exists, otherwise None."""
@@ -90,15 +96,17 @@ def tree_predecessor(node):
     return y
 
 def tree_insert(root, node):
-    """Insert a node in the correct position.
+    """Insert a node in the correct position and return the (possibly new) root.
     
     Begins at the root of the tree and goes downward to find a None to replace with node.
     The trailing pointer y is the parent of x."""
     y = None
     x = root  # start at root
     # Go downward and find where there is a None
+    node.size = 1
     while x is not None:
         y = x
+        x.size += 1  # node will be in the subtree of every node on the path
         if node.key < x.key:
             x = x.left
         else:
@@ -112,9 +120,10 @@ def tree_insert(root, node):
         y.left = node
     else:
         y.right = node
+    return root
 
 def tree_delete(root, node):
-    """Delete a node and adjust the BST.
+    """Delete a node, adjust the BST and return the (possibly new) root.
     
     1. If node has no children, just delete it.
     Its parent will now have a None.
@@ -122,9 +131,11 @@ def tree_delete(root, node):
     The parent of node will replace node for its child.
     3. If node has two children, find node's successor y, then y take node's position.
     The rest of node's right subtree becomes the right subtree of y,
-    and the node's left subtree becomes the y's left subtree."""
+    and the node's left subtree becomes the y's left subtree.
+    The subtree sizes are decremented on the path from the removed position to the root."""
     def transplant(root, node_u, node_v):
-        """Replaces one subtree as a child of its parent with another subtree."""
+        """Replaces one subtree as a child of its parent with another subtree.
+        Returns the root, which changes when node_u was the root."""
         if node_u.parent == None:
             root = node_v
         elif node_u == node_u.parent.left:
@@ -134,27 +145,198 @@ def tree_delete(root, node):
 
         if node_v != None:
             node_v.parent = node_u.parent
+        return root
     
+    def decrement_sizes(x):
+        while x is not None:
+            x.size -= 1
+            x = x.parent
+
     if node.left == None:
-        transplant(root, node, node.right)
+        decrement_sizes(node.parent)
+        root = transplant(root, node, node.right)
     elif node.right == None:
-        transplant(root, node, node.left)
+        decrement_sizes(node.parent)
+        root = transplant(root, node, node.left)
     else:
         y = tree_minimum(node.right)
+        decrement_sizes(y.parent)  # node is one of these ancestors
+        y.size = node.size
 
         if y.parent != node:
-            transplant(root, y, y.right)
+            root = transplant(root, y, y.right)
             y.right = node.right
             y.right.parent = y
 
-        transplant(root, node, y)
+        root = transplant(root, node, y)
         y.left = node.left
         y.left.parent = y
+    node.size = 1
+    return root
+
+# ------------------ Order statistics ------------------ #
+
+def tree_rank(node, key):
+    """Returns the number of keys less than key in the subtree rooted at node, in O(h).
+
+    It is also the position (from 0) that key has, or would have, in sorted order."""
+    rank = 0
+    while node is not None:
+        if key <= node.key:
+            # Keys of the right subtree are >= node.key >= key
+            node = node.left
+        else:
+            # node and its whole left subtree are less than key
+            rank += tree_size(node.left) + 1
+            node = node.right
+    return rank
+
+def tree_select(node, i):
+    """Returns the node with the i-th smallest key (from 0) in the subtree rooted at node, in O(h)."""
+    if not 0 <= i < tree_size(node):
+        raise IndexError("tree_select index out of range")
+    while True:
+        left_size = tree_size(node.left)
+        if i < left_size:
+            node = node.left
+        elif i == left_size:
+            return node
+        else:
+            i -= left_size + 1
+            node = node.right
+
+def tree_count_range(node, lo, hi):
+    """Returns the number of keys k with lo <= k < hi in the subtree rooted at node, in O(h)."""
+    if hi <= lo:
+        return 0
+    return tree_rank(node, hi) - tree_rank(node, lo)
+
+# ------------------ Iterators ------------------ #
+
+def iter_nodes(node, lo=None, hi=None, reverse=False):
+    """Yields the nodes of the subtree rooted at node with lo <= key < hi, in sorted order
+    (in decreasing order with reverse=True). lo and hi are optional.
+
+    An explicit stack holds the ancestors still to be visited, so memory is O(h), and
+    the first node is found by a single descent from the root: k nodes take O(h + k)."""
+    # In reverse, the walk is the mirror image: right instead of left, hi instead of lo
+    first, second = ('right', 'left') if reverse else ('left', 'right')
+
+    def before_start(key):
+        """Whether key comes before the range, in the order of the walk."""
+        if reverse:
+            return hi is not None and not key < hi
+        return lo is not None and key < lo
+
+    def after_end(key):
+        if reverse:
+            return lo is not None and key < lo
+        return hi is not None and not key < hi
+
+    # Descend to the first node of the range, stacking the ancestors to visit after it
+    stack = []
+    while node is not None:
+        if before_start(node.key):
+            node = getattr(node, second)
+        else:
+            stack.append(node)
+            node = getattr(node, first)
+
+    while stack:
+        node = stack.pop()
+        if after_end(node.key):
+            return
+        yield node
+        node = getattr(node, second)
+        while node is not None:  # leftmost (rightmost in reverse) path of the next subtree
+            stack.append(node)
+            node = getattr(node, first)
+
+def tree_items(node, lo=None, hi=None, reverse=False):
+    """Yields the keys k of the subtree rooted at node with lo <= k < hi, in sorted order
+    (in decreasing order with reverse=True). Without lo and hi, all the keys."""
+    for x in iter_nodes(node, lo, hi, reverse):
+        yield x.key
+
+# ------------------ Bulk operations ------------------ #
+
+def _load_merge_sort():
+    """Import merge_sort.py from the Intro folder of this repository."""
+    intro = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Intro')
+    if intro not in sys.path:
+        sys.path.append(intro)
+    import merge_sort
+    return merge_sort
+
+def tree_nodes(root):
+    """Returns the list of the nodes of the tree in sorted order."""
+    return list(iter_nodes(root))
+
+def link_balanced(nodes):
+    """Links the nodes, sorted by key, into a perfectly balanced BST and returns its root.
+
+    The middle node becomes the root and both halves are linked the same way below it,
+    so every node is visited once: O(n), with a recursion depth of log n."""
+    def link(lo, hi, parent):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.parent = parent
+        node.size = hi - lo
+        node.left = link(lo, mid, node)
+        node.right = link(mid + 1, hi, node)
+        return node
+    return link(0, len(nodes), None)
+
+def tree_from_sorted(keys, node_class=Node):
+    """Builds a perfectly balanced BST from sorted keys in O(n) and returns its root."""
+    return link_balanced([node_class(key) for key in keys])
+
+def tree_bulk_load(keys, node_class=Node):
+    """Builds a perfectly balanced BST from keys in any order and returns its root.
+
+    The keys are first sorted with natural_merge_sort (Intro/merge_sort.py), which
+    only checks the order of input that is already sorted, so that case stays O(n).
+    A numeric NumPy array is sorted as is; any other keys are sorted as an object
+    array, so the nodes hold the caller's key objects unchanged (ints stay ints,
+    tuples work)."""
+    if isinstance(keys, np.ndarray) and keys.dtype.kind in 'iuf':
+        keys = np.array(keys)  # copy: the input is not modified
+    else:
+        keys = list(keys)
+        keys = np.fromiter(keys, dtype=object, count=len(keys))
+    if keys.shape[0] > 1:
+        _load_merge_sort().natural_merge_sort(keys)
+    return tree_from_sorted(keys.tolist(), node_class)
+
+def tree_merge(root_a, root_b):
+    """Merges two BSTs into one perfectly balanced BST in O(n) and returns its root.
+
+    Both trees are flattened by inorder walks, their nodes are merged linearly by key
+    with two pointers and relinked, so no node is allocated. Equal keys are all kept,
+    those of root_a first."""
+    nodes_a, nodes_b = tree_nodes(root_a), tree_nodes(root_b)
+    merged = []
+    i, j = 0, 0
+    while i < len(nodes_a) and j < len(nodes_b):
+        if nodes_b[j].key < nodes_a[i].key:
+            merged.append(nodes_b[j])
+            j += 1
+        else:  # ties: root_a first
+            merged.append(nodes_a[i])
+            i += 1
+    merged.extend(nodes_a[i:])
+    merged.extend(nodes_b[j:])
+    return link_balanced(merged)
 
 # ------------------ Plotting functions ------------------ #
 
 def plot_tree_states(states, titles):
     """Plot multiple BST states side by side."""
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     fig, axes = plt.subplots(1, len(states), figsize=(6 * len(states), 6))
     if len(states) == 1:
         axes = [axes]
@@ -200,6 +382,7 @@ def clone_tree(node, parent=None):
         return None
     new_node = Node(node.key)
     new_node.parent = parent
+    new_node.size = node.size
     new_node.left = clone_tree(node.left, new_node)
     new_node.right = clone_tree(node.right, new_node)
     return new_node
@@ -207,6 +390,8 @@ def clone_tree(node, parent=None):
 # ------------------ Testing ------------------ # 
 
 if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
     state = []
     # Generate a tree
     root = Node(20)
@@ -251,7 +436,7 @@ if __name__ == '__main__':
     inorder_tree_walk(root)
 
     print(f"\nDeleting node {k}...")
-    tree_delete(root, node_k)
+    root = tree_delete(root, node_k)
     state.append(clone_tree(root))
 
     print("Inorder after deletion:")
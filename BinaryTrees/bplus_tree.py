@@ -0,0 +1,341 @@
+"""
+Disk-backed B+tree index in a memory-mapped file.
+
+A B+tree stores the keys in its leaves, in sorted order, and the internal nodes only
+route the searches: each one holds up to m separator keys and m + 1 children, where
+separator i is the smallest key of child i + 1. All the leaves are at the same depth
+and are chained left to right, so a range scan descends once and then reads the
+leaves sequentially.
+
+Every node is a fixed-size page of the file (4 KiB by default). With 8-byte keys a
+leaf holds 255 (key, value) pairs and an internal page up to 254 separators, so 100
+million keys take 4 levels. The file is memory-mapped: opening an index only reads
+the header page, and a query only touches the pages on its path, which the OS loads
+on demand. Decoded pages are kept in an LRU cache of cache_size pages.
+
+The index is built once from (key, value) pairs with BPlusTree.build, bottom-up and
+with NumPy, then opened read-only any number of times:
+    index = BPlusTree.build("keys.bpt", keys)   # values default to 0, 1, 2, ...
+    index = BPlusTree("keys.bpt")
+    index.search(42), index.successor(42), list(index.items(10, 20))
+
+File layout (little-endian): page 0 is the header, then the leaves from left to
+right, then the internal levels from the bottom up (the root is the last page).
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import numpy as np
+
+MAGIC = b'BPT1'
+PAGE_SIZE = 4096
+PAGE_HEADER = 16  # kind (1 byte), padding (3), count (4), next leaf (8)
+LEAF, INTERNAL = 1, 2
+NONE = -1  # no page
+
+
+def header_dtype():
+    return np.dtype([('magic', 'S4'), ('page_size', '<u4'), ('key_dtype', 'S4'), ('pad', '<u4'),
+                     ('count', '<i8'), ('root', '<i8'), ('height', '<i8'),
+                     ('first_leaf', '<i8'), ('last_leaf', '<i8')])
+
+def leaf_capacity(page_size):
+    return (page_size - PAGE_HEADER) // 16
+
+def internal_capacity(page_size):
+    """Maximum number of separators of an internal page (it has one more child)."""
+    return (page_size - PAGE_HEADER - 8) // 16
+
+def leaf_dtype(key_dtype, page_size):
+    m = leaf_capacity(page_size)
+    return np.dtype({'names': ['kind', 'count', 'next', 'keys', 'values'],
+                     'formats': ['u1', '<u4', '<i8', (key_dtype, m), ('<i8', m)],
+                     'offsets': [0, 4, 8, PAGE_HEADER, PAGE_HEADER + 8 * m],
+                     'itemsize': page_size})
+
+def internal_dtype(key_dtype, page_size):
+    m = internal_capacity(page_size)
+    return np.dtype({'names': ['kind', 'count', 'keys', 'children'],
+                     'formats': ['u1', '<u4', (key_dtype, m), ('<i8', m + 1)],
+                     'offsets': [0, 4, PAGE_HEADER, PAGE_HEADER + 8 * m],
+                     'itemsize': page_size})
+
+
+class BPlusTree:
+    """Read-only B+tree index stored in the file at path (see BPlusTree.build)."""
+
+    def __init__(self, path, cache_size=1024):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        header = self.data[:header_dtype().itemsize].view(header_dtype())[0]
+        if header['magic'] != MAGIC:
+            raise ValueError(f"{path} is not a B+tree index")
+        self.page_size = int(header['page_size'])
+        self.key_dtype = np.dtype(header['key_dtype'].decode())
+        self.count = int(header['count'])
+        self.root = int(header['root'])
+        self.height = int(header['height'])
+        self.first_leaf = int(header['first_leaf'])
+        self.last_leaf = int(header['last_leaf'])
+        # The whole file seen as an array of leaf pages and as an array of internal pages
+        raw = self.data.view(np.ndarray)
+        self.pages = {LEAF: raw.view(leaf_dtype(self.key_dtype, self.page_size)),
+                      INTERNAL: raw.view(internal_dtype(self.key_dtype, self.page_size))}
+        self.kinds = self.pages[LEAF]['kind']
+        self.cache = OrderedDict()  # page number -> (kind, next, keys, values or children)
+        self.cache_size = cache_size
+        self.hits = self.misses = 0
+
+    @classmethod
+    def build(cls, path, keys, values=None, page_size=PAGE_SIZE, cache_size=1024):
+        """Write an index of the keys (int64 or float64) to path and open it.
+
+        values are int64 payloads (by default the position of each key in keys).
+        Unsorted keys are first sorted, stably, with np.argsort(kind='stable').
+        The leaves are filled completely and every level is written with NumPy, in O(n)."""
+        keys = np.asarray(keys)
+        key_dtype = np.dtype('<f8') if keys.dtype.kind == 'f' else np.dtype('<i8')
+        keys = keys.astype(key_dtype)
+        values = np.arange(keys.shape[0]) if values is None else np.asarray(values, dtype='<i8')
+        if values.shape != keys.shape:
+            raise ValueError("keys and values must have the same length")
+        if keys.shape[0] > 1 and np.any(keys[1:] < keys[:-1]):
+            order = np.argsort(keys, kind='stable')
+            keys, values = keys[order], values[order]
+        if internal_capacity(page_size) < 2:
+            raise ValueError("page_size is too small")
+
+        # Number of pages of every level, from the leaves up
+        n = keys.shape[0]
+        m_leaf, m_internal = leaf_capacity(page_size), internal_capacity(page_size)
+        levels = [-(-n // m_leaf)] if n else []
+        while levels and levels[-1] > 1:
+            levels.append(-(-levels[-1] // (m_internal + 1)))
+        # Written to a temporary file that then replaces path, so that processes that
+        # have the old index mapped keep reading a complete file
+        tmp_path = path + '.tmp'
+        data = np.memmap(tmp_path, dtype=np.uint8, mode='w+', shape=(page_size * (1 + sum(levels)),))
+
+        first = 1  # first page of the current level
+        if n:
+            leaves = data[page_size:page_size * (1 + levels[0])].view(leaf_dtype(key_dtype, page_size))
+            padded_keys = np.zeros(levels[0] * m_leaf, dtype=key_dtype)
+            padded_values = np.zeros(levels[0] * m_leaf, dtype='<i8')
+            padded_keys[:n], padded_values[:n] = keys, values
+            leaves['kind'] = LEAF
+            leaves['count'] = m_leaf
+            leaves['count'][-1] = n - (levels[0] - 1) * m_leaf
+            leaves['next'] = np.arange(first + 1, first + 1 + levels[0])
+            leaves['next'][-1] = NONE
+            leaves['keys'] = padded_keys.reshape(levels[0], m_leaf)
+            leaves['values'] = padded_values.reshape(levels[0], m_leaf)
+            minimums = keys[::m_leaf]  # smallest key of every page of the level
+
+        for size in levels[1:]:
+            start = first + len(minimums)  # first page of the new level
+            pages = data[page_size * start:page_size * (start + size)].view(internal_dtype(key_dtype, page_size))
+            children = np.arange(first, start)
+            groups = np.full(size * (m_internal + 1), NONE, dtype='<i8')
+            groups[:children.shape[0]] = children
+            groups = groups.reshape(size, m_internal + 1)
+            separators = np.zeros(size * (m_internal + 1), dtype=key_dtype)
+            separators[:minimums.shape[0]] = minimums
+            pages['kind'] = INTERNAL
+            pages['count'] = (groups != NONE).sum(axis=1) - 1
+            pages['keys'] = separators.reshape(size, m_internal + 1)[:, 1:]
+            pages['children'] = groups
+            minimums = minimums[::m_internal + 1]
+            first = start
+
+        header = data[:header_dtype().itemsize].view(header_dtype())
+        header['magic'] = MAGIC
+        header['page_size'] = page_size
+        header['key_dtype'] = key_dtype.str.encode()
+        header['count'] = n
+        header['root'] = first + len(minimums) - 1 if n else NONE
+        header['height'] = len(levels)
+        header['first_leaf'] = 1 if n else NONE
+        header['last_leaf'] = levels[0] if n else NONE
+        data.flush()
+        del data
+        os.replace(tmp_path, path)
+        return cls(path, cache_size)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def __iter__(self):
+        for key, _ in self.items():
+            yield key
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Drop the page cache and unmap the file."""
+        self.cache.clear()
+        self.data = self.pages = self.kinds = None
+
+    # ------------------ Pages ------------------ #
+
+    def page(self, number):
+        """Decoded page: (kind, next leaf, keys, values for a leaf or children), through the LRU cache.
+
+        Leaves are NumPy views of the mapped file. The fields of internal pages, which
+        are on the path of every query, are converted to lists once per miss, since bisect
+        on a list is much faster than a NumPy call on a few hundred elements."""
+        cache = self.cache
+        if number in cache:
+            self.hits += 1
+            cache.move_to_end(number)
+            return cache[number]
+        self.misses += 1
+        kind = self.kinds[number]
+        record = self.pages[kind][number]
+        count = int(record['count'])
+        if kind == LEAF:
+            page = (LEAF, int(record['next']), record['keys'][:count], record['values'][:count])
+        else:
+            page = (INTERNAL, NONE, record['keys'][:count].tolist(),
+                    record['children'][:count + 1].tolist())
+        cache[number] = page
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)  # least recently used
+        return page
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.cache)}
+
+    def _bound(self, key, side='left'):
+        """Position (leaf page, index) of the first key >= key (side='left') or > key
+        (side='right'), or None if there is no such key."""
+        if self.root == NONE:
+            return None
+        number = self.root
+        bisect = bisect_left if side == 'left' else bisect_right
+        kind, next_leaf, keys, children = self.page(number)
+        while kind == INTERNAL:
+            # Child i holds the keys between separators i - 1 and i
+            number = children[bisect(keys, key)]
+            kind, next_leaf, keys, children = self.page(number)
+        i = int(keys.searchsorted(key, side))
+        if i == keys.shape[0]:  # the bound is the first key of the next leaf
+            if next_leaf == NONE:
+                return None
+            return next_leaf, 0
+        return number, i
+
+    # ------------------ Queries ------------------ #
+
+    def search(self, key):
+        """Return the value of a key equal to key (the first one), or None."""
+        position = self._bound(key)
+        if position is None:
+            return None
+        _, _, keys, values = self.page(position[0])
+        if keys[position[1]] != key:
+            return None
+        return values[position[1]].item()
+
+    def minimum(self):
+        """Return (key, value) of the smallest key, or None for an empty index."""
+        if self.first_leaf == NONE:
+            return None
+        _, _, keys, values = self.page(self.first_leaf)
+        return keys[0].item(), values[0].item()
+
+    def maximum(self):
+        """Return (key, value) of the largest key, or None for an empty index."""
+        if self.last_leaf == NONE:
+            return None
+        _, _, keys, values = self.page(self.last_leaf)
+        return keys[-1].item(), values[-1].item()
+
+    def successor(self, key):
+        """Return (key, value) of the smallest key greater than key, or None."""
+        position = self._bound(key, 'right')
+        if position is None:
+            return None
+        _, _, keys, values = self.page(position[0])
+        return keys[position[1]].item(), values[position[1]].item()
+
+    def items(self, lo=None, hi=None):
+        """Yield the pairs (key, value) with lo <= key < hi in sorted order, lazily.
+
+        One descent finds the first key, then the chained leaves are read in order."""
+        if lo is None:
+            position = None if self.first_leaf == NONE else (self.first_leaf, 0)
+        else:
+            position = self._bound(lo)
+        if position is None:
+            return
+        number, i = position
+        while number != NONE:
+            _, next_leaf, keys, values = self.page(number)
+            end = keys.shape[0]
+            if hi is not None and not keys[-1] < hi:
+                end = int(keys.searchsorted(hi, 'left'))
+            yield from zip(keys[i:end].tolist(), values[i:end].tolist())
+            if end < keys.shape[0]:
+                return
+            number, i = next_leaf, 0
+
+    def count_range(self, lo, hi):
+        """Number of keys with lo <= key < hi (reads the leaves of the range)."""
+        return sum(1 for _ in self.items(lo, hi))
+
+
+def benchmark(size=10**7, queries=10**5, path=None, seed=42):
+    """Build an index of size random int64 keys, then time opening it and searching it.
+
+    By default the index is written to a temporary directory, deleted at the end;
+    a given path is kept."""
+    rng = np.random.default_rng(seed)
+    keys = np.sort(rng.integers(0, 2**62, size))
+    folder = tempfile.mkdtemp(prefix='bplus_tree_') if path is None else None
+    if path is None:
+        path = os.path.join(folder, 'benchmark.bpt')
+    try:
+        start_time = time.perf_counter()
+        BPlusTree.build(path, keys).close()
+        build_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        index = BPlusTree(path)
+        open_time = time.perf_counter() - start_time
+
+        targets = rng.choice(keys, queries).tolist()
+        start_time = time.perf_counter()
+        for key in targets:
+            index.search(key)
+        search_time = time.perf_counter() - start_time
+        print(f"{size} keys, {os.path.getsize(path) / 2**20:.0f} MiB, height {index.height}: "
+              f"build {build_time:.2f} s, open {open_time * 1000:.2f} ms, "
+              f"search {queries / search_time:,.0f} ops/s, cache {index.cache_info()}")
+        index.close()
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
+    return {'build_seconds': build_time, 'open_seconds': open_time,
+            'search_per_second': queries / search_time}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build, open and search a B+tree index.')
+    parser.add_argument('--size', type=int, default=10**7)
+    parser.add_argument('--queries', type=int, default=10**5)
+    parser.add_argument('--path', default=None, help='keep the index at this path '
+                        '(by default it is written to a temporary directory and deleted)')
+    args = parser.parse_args()
+    benchmark(args.size, args.queries, args.path)
@@ -0,0 +1,281 @@
+"""
+Compact storage for binary search trees with millions of keys.
+
+Every Node of binary_search_tree.py is a Python object with its own __dict__, over
+100 bytes per key plus the key object, and the garbage collector has to track each
+of them. Two more compact representations:
+- SlotNode: a Node with __slots__ (no __dict__), a drop-in replacement that works
+  with tree_insert, tree_delete and the other functions of binary_search_tree.py.
+- CompactBST: a struct-of-arrays pool. Node i is the integer index i into four
+  array.array columns (key, left, right, parent), and NIL (-1) plays the role of None.
+  The keys are stored unboxed (float64 or int64), so a node costs 32 bytes and there
+  are no objects for the garbage collector to track. The slots of deleted nodes form
+  a free list, threaded through the right column, and are reused by later insertions.
+
+Run this file to compare memory and throughput with the Node class:
+    python compact_bst.py --sizes 100000 1000000
+"""
+
+import argparse
+import array
+import gc
+import random
+import time
+import tracemalloc
+from binary_search_tree import Node, iterative_tree_search, tree_insert
+
+NIL = -1
+
+
+class SlotNode:
+    """Node with __slots__ (not a subclass: it would inherit the __dict__ of Node)."""
+    __slots__ = ('key', 'left', 'right', 'parent', 'size')
+
+    __init__ = Node.__init__
+
+
+class CompactBST:
+    """BST of numbers stored as a struct of arrays, with a free list of deleted slots.
+
+    Nodes are integer indices; self.key[i], self.left[i], self.right[i] and
+    self.parent[i] are the fields of node i. typecode is the array.array type of the
+    keys: 'd' (float64) or 'q' (int64). Same BST property as binary_search_tree.py:
+    equal keys go to the right."""
+
+    def __init__(self, capacity=16, typecode='d'):
+        capacity = max(1, capacity)
+        self.key = array.array(typecode, bytes(array.array(typecode).itemsize * capacity))
+        self.left = array.array('q', [NIL]) * capacity
+        self.right = array.array('q', [NIL]) * capacity
+        self.parent = array.array('q', [NIL]) * capacity
+        self.root = NIL
+        self.size = 0
+        self.used = 0        # slots ever allocated; the slots after them are unused
+        self.free = NIL      # head of the free list
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.search(key) != NIL
+
+    def __iter__(self):
+        """Keys in sorted order."""
+        if self.root == NIL:
+            return
+        i = self.minimum(self.root)
+        while i != NIL:
+            yield self.key[i]
+            i = self.successor(i)
+
+    # ------------------ Slot allocation ------------------ #
+
+    def _allocate(self, key):
+        """Return a slot for a new node: from the free list, or a new one at the end."""
+        if self.free != NIL:
+            i = self.free
+            self.free = self.right[i]
+        else:
+            if self.used == len(self.key):  # full: double the capacity
+                for column in (self.key, self.left, self.right, self.parent):
+                    column.extend(column)
+            i = self.used
+            self.used += 1
+        self.key[i] = key
+        self.left[i] = self.right[i] = self.parent[i] = NIL
+        return i
+
+    def _release(self, i):
+        """Put the slot i at the head of the free list."""
+        self.left[i] = self.parent[i] = NIL
+        self.right[i] = self.free
+        self.free = i
+
+    # ------------------ Queries ------------------ #
+
+    def search(self, key):
+        """Return the index of a node with the key if one exists, otherwise NIL."""
+        keys, left, right = self.key, self.left, self.right
+        i = self.root
+        while i != NIL:
+            k = keys[i]
+            if key == k:
+                return i
+            i = left[i] if key < k else right[i]
+        return NIL
+
+    def minimum(self, i):
+        """Return the node with the minimum key in the subtree rooted at i."""
+        left = self.left
+        while left[i] != NIL:
+            i = left[i]
+        return i
+
+    def maximum(self, i):
+        """Return the node with the maximum key in the subtree rooted at i."""
+        right = self.right
+        while right[i] != NIL:
+            i = right[i]
+        return i
+
+    def successor(self, i):
+        """Return the successor of node i, or NIL."""
+        if self.right[i] != NIL:
+            return self.minimum(self.right[i])
+        parent, right = self.parent, self.right
+        y = parent[i]
+        while y != NIL and i == right[y]:
+            i = y
+            y = parent[y]
+        return y
+
+    def predecessor(self, i):
+        """Return the predecessor of node i, or NIL."""
+        if self.left[i] != NIL:
+            return self.maximum(self.left[i])
+        parent, left = self.parent, self.left
+        y = parent[i]
+        while y != NIL and i == left[y]:
+            i = y
+            y = parent[y]
+        return y
+
+    # ------------------ Insertion and deletion ------------------ #
+
+    def insert(self, key):
+        """Insert key (as tree_insert does) and return the index of its node."""
+        keys, left, right = self.key, self.left, self.right
+        y = NIL
+        x = self.root
+        while x != NIL:
+            y = x
+            x = left[x] if key < keys[x] else right[x]
+
+        z = self._allocate(key)
+        self.parent[z] = y
+        if y == NIL:
+            self.root = z  # tree was empty
+        elif key < keys[y]:
+            left[y] = z
+        else:
+            right[y] = z
+        self.size += 1
+        return z
+
+    def _transplant(self, u, v):
+        """Replace the subtree rooted at u with the subtree rooted at v."""
+        parent = self.parent
+        p = parent[u]
+        if p == NIL:
+            self.root = v
+        elif u == self.left[p]:
+            self.left[p] = v
+        else:
+            self.right[p] = v
+        if v != NIL:
+            parent[v] = p
+
+    def delete(self, z):
+        """Delete node z (as tree_delete does) and put its slot on the free list."""
+        left, right, parent = self.left, self.right, self.parent
+        if left[z] == NIL:
+            self._transplant(z, right[z])
+        elif right[z] == NIL:
+            self._transplant(z, left[z])
+        else:
+            y = self.minimum(right[z])
+            if parent[y] != z:
+                self._transplant(y, right[y])
+                right[y] = right[z]
+                parent[right[y]] = y
+            self._transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+        self._release(z)
+        self.size -= 1
+
+    def remove(self, key):
+        """Delete a node with the key; raise KeyError if there is none."""
+        i = self.search(key)
+        if i == NIL:
+            raise KeyError(key)
+        self.delete(i)
+
+    def nbytes(self):
+        """Memory used by the columns, in bytes."""
+        return sum(c.itemsize * len(c) for c in (self.key, self.left, self.right, self.parent))
+
+
+# ------------------ Benchmark ------------------ #
+
+def _build_nodes(keys, node_class):
+    root = None
+    for key in keys:
+        root = tree_insert(root, node_class(key))
+    return root
+
+def _build_compact(keys):
+    tree = CompactBST(capacity=len(keys))
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+def benchmark(sizes=(10**5, 10**6), seed=42):
+    """Compare Node, SlotNode and CompactBST on n random float keys.
+
+    Measures the memory allocated by the tree (with tracemalloc; the key objects are
+    shared with the input list and not counted for the node classes), the
+    insertion and search throughput and the time of a full garbage collection with
+    the tree alive. Returns a list of dictionaries, one per size and representation."""
+    results = []
+    for n in sizes:
+        random.seed(seed)
+        keys = [random.random() for _ in range(n)]
+        queries = random.sample(keys, min(n, 10**5))
+        builds = {
+            'Node': lambda: _build_nodes(keys, Node),
+            'SlotNode': lambda: _build_nodes(keys, SlotNode),
+            'CompactBST': lambda: _build_compact(keys),
+        }
+        for name, build in builds.items():
+            gc.collect()
+            tracemalloc.start()
+            tree = build()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del tree
+            gc.collect()
+
+            start_time = time.perf_counter()
+            tree = build()
+            insert_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            if name == 'CompactBST':
+                for key in queries:
+                    tree.search(key)
+            else:
+                for key in queries:
+                    iterative_tree_search(tree, key)
+            search_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            gc.collect()
+            gc_time = time.perf_counter() - start_time
+            del tree
+
+            results.append({'n': n, 'tree': name, 'bytes_per_key': memory / n,
+                            'insert_per_second': n / insert_time,
+                            'search_per_second': len(queries) / search_time,
+                            'gc_seconds': gc_time})
+            print(f"n = {n:>9} | {name:>10} --> {memory / n:>6.1f} bytes/key, "
+                  f"insert {n / insert_time:>10,.0f} ops/s, "
+                  f"search {len(queries) / search_time:>10,.0f} ops/s, gc {gc_time:.3f} s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Memory and throughput of BST node representations.')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10**5, 10**6])
+    args = parser.parse_args()
+    benchmark(args.sizes)
@@ -0,0 +1,245 @@
+"""
+Thread-safe BST with lock-free snapshot reads.
+
+The functions of binary_search_tree.py modify the left, right and parent pointers in
+place, so a reader running concurrently with tree_delete can follow a half-done
+transplant. ConcurrentTree uses the persistent tree of persistent_bst.py instead
+(copy-on-write, RCU-style):
+- writers take a lock, build the next version by path copying (the nodes of the
+  current version are never modified, and the tree is weight-balanced, so only
+  O(log n) nodes are copied even for increasing keys) and publish it with a single
+  assignment of the root reference, which is atomic;
+- readers take no lock at all: they read the current root once and run their whole
+  query on that version. A snapshot stays consistent for as long as it is used, and
+  old versions are freed by the garbage collector once no reader holds them.
+
+Run this file to measure the read throughput with and without a concurrent writer,
+compared with a tree of Node objects protected by a single lock:
+    python concurrent_bst.py --size 100000 --threads 1 2 4 --seconds 2
+"""
+
+import argparse
+import random
+import threading
+import time
+from binary_search_tree import (Node, iterative_tree_search, tree_insert, tree_delete,
+                                tree_bulk_load, tree_size, tree_rank, tree_select,
+                                tree_count_range, tree_items, tree_minimum, tree_maximum)
+from persistent_bst import persistent_from_sorted, persistent_insert, persistent_delete
+
+
+class TreeSnapshot:
+    """Read-only view of one version of a ConcurrentTree."""
+
+    def __init__(self, root, version):
+        self.root = root
+        self.version = version
+
+    def __len__(self):
+        return tree_size(self.root)
+
+    def __contains__(self, key):
+        return iterative_tree_search(self.root, key) is not None
+
+    def __iter__(self):
+        return tree_items(self.root)
+
+    def search(self, key):
+        return iterative_tree_search(self.root, key)
+
+    def minimum(self):
+        return None if self.root is None else tree_minimum(self.root)
+
+    def maximum(self):
+        return None if self.root is None else tree_maximum(self.root)
+
+    def successor(self, key):
+        """Node with the smallest key greater than key, or None (nodes have no parent pointers)."""
+        node, successor = self.root, None
+        while node is not None:
+            if key < node.key:
+                successor = node
+                node = node.left
+            else:
+                node = node.right
+        return successor
+
+    def predecessor(self, key):
+        """Node with the largest key less than key, or None."""
+        node, predecessor = self.root, None
+        while node is not None:
+            if node.key < key:
+                predecessor = node
+                node = node.right
+            else:
+                node = node.left
+        return predecessor
+
+    def rank(self, key):
+        return tree_rank(self.root, key)
+
+    def select(self, i):
+        return tree_select(self.root, i)
+
+    def count_range(self, lo, hi):
+        return tree_count_range(self.root, lo, hi)
+
+    def items(self, lo=None, hi=None, reverse=False):
+        return tree_items(self.root, lo, hi, reverse)
+
+
+class ConcurrentTree:
+    """BST shared between threads: serialized writers, lock-free readers.
+
+    Readers call snapshot() and query the returned TreeSnapshot; the query methods of
+    the tree itself take a new snapshot per call."""
+
+    def __init__(self, keys=()):
+        self._write_lock = threading.Lock()
+        # Replaced as a whole, never modified
+        self._snapshot = TreeSnapshot(persistent_from_sorted(sorted(keys)), 0)
+
+    def snapshot(self):
+        """Current version, consistent for as long as the caller uses it."""
+        return self._snapshot
+
+    def update(self, insert=(), delete=()):
+        """Apply the insertions, then the deletions, and publish them as one new version.
+
+        Readers see either none or all of the changes. Raises KeyError (and publishes
+        nothing) if a deleted key is not present."""
+        with self._write_lock:
+            current = self._snapshot
+            root = current.root
+            for key in insert:
+                root = persistent_insert(root, key)
+            for key in delete:
+                root = persistent_delete(root, key)
+            self._snapshot = TreeSnapshot(root, current.version + 1)  # publish
+            return self._snapshot.version
+
+    def insert(self, key):
+        """Insert key in a new version and return the number of that version."""
+        return self.update(insert=(key,))
+
+    def delete(self, key):
+        """Delete one node with key in a new version and return the number of that version."""
+        return self.update(delete=(key,))
+
+    def __len__(self):
+        return len(self._snapshot)
+
+    def __contains__(self, key):
+        return key in self._snapshot
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    def search(self, key):
+        return self._snapshot.search(key)
+
+    def successor(self, key):
+        return self._snapshot.successor(key)
+
+    def predecessor(self, key):
+        return self._snapshot.predecessor(key)
+
+    def rank(self, key):
+        return self._snapshot.rank(key)
+
+    def select(self, i):
+        return self._snapshot.select(i)
+
+    def count_range(self, lo, hi):
+        return self._snapshot.count_range(lo, hi)
+
+    def items(self, lo=None, hi=None, reverse=False):
+        return self._snapshot.items(lo, hi, reverse)
+
+
+class LockedTree:
+    """Baseline for the benchmark: a tree of Node objects behind a single lock."""
+
+    def __init__(self, keys=()):
+        self._lock = threading.Lock()
+        self.root = tree_bulk_load(list(keys))
+
+    def search(self, key):
+        with self._lock:
+            return iterative_tree_search(self.root, key)
+
+    def insert(self, key):
+        with self._lock:
+            self.root = tree_insert(self.root, Node(key))
+
+    def delete(self, key):
+        with self._lock:
+            node = iterative_tree_search(self.root, key)
+            if node is None:
+                raise KeyError(key)
+            self.root = tree_delete(self.root, node)
+
+
+def measure_reads(tree, keys, threads, seconds, writer=False, seed=42):
+    """Reads per second of threads readers searching random keys for the given time.
+
+    With writer=True, one more thread keeps inserting and deleting keys meanwhile."""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def read(t):
+        rng = random.Random(seed + t)
+        queries = [rng.choice(keys) for _ in range(4096)]
+        count = 0
+        while not stop.is_set():
+            for key in queries:
+                tree.search(key)
+            count += len(queries)
+        counts[t] = count
+
+    def write():
+        rng = random.Random(seed)
+        while not stop.is_set():
+            key = rng.random()
+            tree.insert(key)
+            tree.delete(key)
+
+    workers = [threading.Thread(target=read, args=(t,)) for t in range(threads)]
+    if writer:
+        workers.append(threading.Thread(target=write))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+
+def benchmark(size=10**5, threads=(1, 2, 4), seconds=2.0, seed=42):
+    """Compare the read throughput of ConcurrentTree and LockedTree.
+
+    Returns a list of dictionaries with the reads per second for each tree, number of
+    reader threads, and with or without a concurrent writer."""
+    rng = random.Random(seed)
+    keys = sorted(rng.random() for _ in range(size))
+    trees = {'ConcurrentTree': ConcurrentTree(keys), 'LockedTree': LockedTree(keys)}
+    results = []
+    for writer in (False, True):
+        for n in threads:
+            for name, tree in trees.items():
+                reads = measure_reads(tree, keys, n, seconds, writer, seed)
+                results.append({'tree': name, 'threads': n, 'writer': writer,
+                                'reads_per_second': reads})
+                print(f"{name:>14} | {n} readers{' + writer' if writer else ''} --> "
+                      f"{reads:>12,.0f} reads/s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Read throughput of the concurrent BST.')
+    parser.add_argument('--size', type=int, default=10**5)
+    parser.add_argument('--threads', nargs='+', type=int, default=[1, 2, 4])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+    benchmark(args.size, args.threads, args.seconds)
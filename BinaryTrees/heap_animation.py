@@ -0,0 +1,304 @@
+"""
+Offline animation export for the binary heap functions.
+
+The steps of an algorithm are recorded with HeapRecorder (binary_heap.py) and then
+rendered to a GIF or MP4 file without opening any window:
+    recorder = HeapRecorder()
+    Heapsort(A, observer=recorder)
+    export_animation(recorder.events, "heapsort.gif")
+
+Compared to visualize_heap, which rebuilds a NetworkX graph and its layout at every
+step and then sleeps in plt.pause:
+- the layout of a heap only depends on its size, so it is computed once per size
+  directly from the array indices;
+- each worker draws the edges once on a non-interactive Agg canvas, rasterizes every
+  label text once, and then only redraws the nodes whose color or label changed and
+  the title of every frame;
+- the frames are rasterized (and quantized for GIF) in parallel worker processes,
+  in chunks of consecutive frames, and streamed in order to the file: GIFs frame by
+  frame with a global palette, videos through imageio.
+"""
+
+import os
+from collections import deque
+from functools import lru_cache
+from multiprocessing import Pool
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties, findfont, get_font
+from PIL import GifImagePlugin, Image
+from binary_heap import Parent
+
+COLORS = {
+    'default': 'lightblue',
+    'current': 'red',         # current node being evaluated
+    'changed': 'lightgreen',  # nodes that were changed
+}
+RGB = {name: 255 * np.array(to_rgb(color), dtype=np.float32) for name, color in COLORS.items()}
+BLACK = np.zeros(3, dtype=np.float32)
+
+
+@lru_cache(maxsize=None)
+def heap_layout(n):
+    """Positions (x, y) of the n nodes of a heap: level by level, each node centered
+    in its share of the width, like hierarchy_pos for a complete binary tree."""
+    index = np.arange(n)
+    depth = np.floor(np.log2(index + 1)).astype(int)
+    first = 2 ** depth - 1  # index of the first node of each level
+    x = (index - first + 0.5) / 2.0 ** depth
+    y = -depth.astype(float)
+    return np.column_stack((x, y))
+
+
+def text_sprite(text, fontsize, dpi):
+    """Rasterize text once with FreeType (as Agg does) and return its coverage (alpha)."""
+    font = get_font(findfont(FontProperties()))
+    font.set_size(fontsize, dpi)
+    font.set_text(text, 0.0)
+    font.draw_glyphs_to_bitmap()
+    return np.asarray(font.get_image(), dtype=np.float32) / 255.0
+
+
+def disk_sprite(radius):
+    """Anti-aliased coverage of a disk of the given radius in pixels."""
+    size = int(np.ceil(radius)) * 2 + 1
+    d = np.hypot(*np.mgrid[:size, :size] - size // 2)
+    return np.clip(radius + 0.5 - d, 0.0, 1.0)
+
+
+class HeapFrameRenderer:
+    """Draws frames of a heap of n nodes, reusing everything that does not change.
+
+    The edges are drawn once per heap size with Agg (the background). Node disks and
+    label texts are rasterized once (per distinct text) and stamped with NumPy in the
+    cell of each node. The previous frame is kept, so only the cells of the nodes
+    whose color or label changed (and the title) are redrawn."""
+
+    def __init__(self, size=(8, 6), dpi=100):
+        self.figure = Figure(figsize=size, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.dpi = dpi
+        self.texts = {}  # (text, fontsize) -> coverage
+        self.n = None
+
+    def _setup(self, n):
+        """Draw the parts of the frame that only depend on the heap size."""
+        self.figure.clear()
+        ax = self.figure.add_axes([0.02, 0.02, 0.96, 0.86])
+        ax.axis('off')
+        pos = heap_layout(n)
+        edges = [(pos[Parent(i)], pos[i]) for i in range(1, n)]
+        ax.add_collection(LineCollection(edges, colors='gray', linewidths=1))
+        lowest = pos[:, 1].min() if n else 0.0  # y of the last level
+        ax.set_xlim(0, 1)
+        ax.set_ylim(lowest - 0.3, 0.3)
+        self.canvas.draw()
+        self.background = np.asarray(self.canvas.buffer_rgba())[..., :3].astype(np.float32)
+
+        # Node centers in pixels (rows counted from the top)
+        height, width = self.background.shape[:2]
+        xy = ax.transData.transform(pos)
+        self.centers = np.column_stack((height - xy[:, 1], xy[:, 0])).round().astype(int)
+        levels = int(-lowest) + 1
+        spacing = width * 0.96 / 2 ** (levels - 1)  # between nodes of the last level
+        self.radius = float(np.clip(0.45 * spacing, 3, 20))
+        self.disk = disk_sprite(self.radius)
+        self.font_size = self.radius * 72 / self.dpi
+        # Disjoint cell around each node, redrawn when the node changes
+        self.half_width = max(1, int(spacing // 2))
+        self.half_height = int(np.ceil(self.radius)) + 1
+        # Band above the root (the top quarter of an empty heap's frame)
+        self.title_height = int(self.centers[0, 0] - self.half_height - 1) if n else height // 4
+
+        self.frame = self.background.astype(np.uint8)
+        self.state = [None] * n  # (label, color) drawn in each cell
+        self.title = None
+        self.n = n
+
+    def _text(self, text, fontsize):
+        key = (text, fontsize)
+        if key not in self.texts:
+            self.texts[key] = text_sprite(text, fontsize, self.dpi)
+        return self.texts[key]
+
+    @staticmethod
+    def _stamp(frame, coverage, row, col, color):
+        """Blend color into frame with the coverage sprite centered at (row, col)."""
+        h, w = coverage.shape
+        top, left = row - h // 2, col - w // 2
+        r0, c0 = max(top, 0), max(left, 0)
+        r1, c1 = min(top + h, frame.shape[0]), min(left + w, frame.shape[1])
+        if r0 >= r1 or c0 >= c1:
+            return
+        a = coverage[r0 - top:r1 - top, c0 - left:c1 - left, None]
+        region = frame[r0:r1, c0:c1]
+        region *= 1.0 - a
+        region += a * color
+
+    def _draw_node(self, i, text, color):
+        """Redraw the cell of node i with the given label and color name."""
+        row, col = self.centers[i]
+        r0, c0 = max(row - self.half_height, 0), max(col - self.half_width, 0)
+        r1, c1 = row + self.half_height + 1, col + self.half_width
+        cell = self.background[r0:r1, c0:c1].copy()
+        self._stamp(cell, self.disk, row - r0, col - c0, RGB[color])
+        self._stamp(cell, self._text(text, self.font_size), row - r0, col - c0, BLACK)
+        self.frame[r0:r1, c0:c1] = cell
+
+    def _draw_title(self, text):
+        band = self.background[:self.title_height].copy()
+        if text:
+            title = self._text(text, 14)
+            self._stamp(band, title, title.shape[0] // 2 + 5, band.shape[1] // 2, BLACK)
+        self.frame[:self.title_height] = band
+
+    def render(self, event):
+        """Return the frame of a recorded event as an RGB array."""
+        A = event['array']
+        if len(A) != self.n:
+            self._setup(len(A))
+
+        changed = set(event['changed_nodes'])
+        for i, value in enumerate(A):
+            if i == event['current_node']:
+                color = 'current'
+            elif i in changed:
+                color = 'changed'
+            else:
+                color = 'default'
+            state = (str(value), color)
+            if state != self.state[i]:
+                self._draw_node(i, *state)
+                self.state[i] = state
+
+        if event['title'] != self.title:
+            self._draw_title(event['title'])
+            self.title = event['title']
+        return self.frame.copy()
+
+
+# Renderer (and GIF palette) of each worker process, set by _init_worker
+_renderer = None
+_palette = None
+
+def _init_worker(size, dpi, palette=None):
+    global _renderer, _palette
+    _renderer = HeapFrameRenderer(size, dpi)
+    _palette = None
+    if palette is not None:
+        _palette = Image.new('P', (1, 1))
+        _palette.putpalette(palette)
+
+def _render_chunk(events):
+    frames = [_renderer.render(event) for event in events]
+    if _palette is not None:  # quantize here, in parallel, to 1 byte per pixel
+        frames = [np.asarray(Image.fromarray(frame).quantize(palette=_palette, dither=Image.Dither.NONE))
+                  for frame in frames]
+    return frames
+
+
+def render_frames(events, workers=None, size=(8, 6), dpi=100, chunk_size=64, palette=None):
+    """Yield the frames of the recorded events, in order.
+
+    The frames are RGB arrays, or arrays of indices into palette (a flat list of RGB
+    values) if one is given. With workers > 1 chunks of consecutive frames are
+    rendered in parallel processes; only a few chunks are in flight at a time, so
+    memory does not grow with the number of frames."""
+    chunks = [events[i:i + chunk_size] for i in range(0, len(events), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(chunks)))
+    if workers == 1:
+        _init_worker(size, dpi, palette)
+        for chunk in chunks:
+            yield from _render_chunk(chunk)
+        return
+
+    with Pool(workers, initializer=_init_worker, initargs=(size, dpi, palette)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_render_chunk, (chunk,)))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def gif_palette(events, size=(8, 6), dpi=100):
+    """Global 256-color palette for the frames of the events.
+
+    It is computed from the first frame and from a frame with every node highlighted,
+    so that all the colors (and their anti-aliased blends) are covered."""
+    if not events:
+        raise ValueError("no events to animate")
+    renderer = HeapFrameRenderer(size, dpi)
+    first = renderer.render(events[0])
+    n = len(events[0]['array'])
+    highlighted = renderer.render(dict(events[0], current_node=0, changed_nodes=list(range(1, n))))
+    sample = Image.fromarray(np.concatenate((first, highlighted)))
+    return sample.quantize(colors=256, method=Image.Quantize.MEDIANCUT).getpalette()
+
+
+def write_gif(frames, path, palette, fps=10, loop=0):
+    """Write frames of palette indices to an animated GIF as they come.
+
+    Pillow (and imageio) keep every frame in memory until the file is closed, so the
+    GIF is written here frame by frame with the global palette instead. After the
+    first frame only the bounding box of the pixels that changed is encoded."""
+    duration = int(1000 / fps)
+    previous = None
+    with open(path, 'wb') as f:
+        for frame in frames:
+            offset = (0, 0)
+            if previous is None:
+                im = Image.fromarray(frame, 'P')
+                im.putpalette(palette)
+                header, _ = GifImagePlugin.getheader(im, info={'loop': loop, 'optimize': False})
+                f.write(b''.join(header))
+            else:
+                diff = frame != previous
+                rows, cols = np.flatnonzero(diff.any(axis=1)), np.flatnonzero(diff.any(axis=0))
+                if rows.shape[0] == 0:  # same frame: repeat one pixel
+                    rows, cols = np.zeros(1, dtype=int), np.zeros(1, dtype=int)
+                r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+                im = Image.fromarray(np.ascontiguousarray(frame[r0:r1, c0:c1]), 'P')
+                im.putpalette(palette)
+                offset = (int(c0), int(r0))
+            f.write(b''.join(GifImagePlugin.getdata(im, offset, duration=duration)))
+            previous = frame
+        f.write(b';')  # trailer
+
+
+def export_animation(events, path, fps=10, workers=None, size=(8, 6), dpi=100, chunk_size=64):
+    """Write the recorded events as an animation to path (.gif, or a video such as .mp4).
+
+    Videos are written with imageio; MP4 files need the imageio-ffmpeg plugin."""
+    if not events:
+        raise ValueError("no events to animate")
+    if path.lower().endswith('.gif'):
+        palette = gif_palette(events, size, dpi)
+        write_gif(render_frames(events, workers, size, dpi, chunk_size, palette), path, palette, fps)
+        return path
+
+    import imageio.v2 as imageio
+
+    with imageio.get_writer(path, fps=fps) as writer:
+        for frame in render_frames(events, workers, size, dpi, chunk_size):
+            writer.append_data(frame)
+    return path
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from binary_heap import Heapsort, HeapRecorder
+
+    random.seed(42)
+    A = [random.randint(0, 999) for _ in range(200)]
+    recorder = HeapRecorder()
+    Heapsort(A, observer=recorder)
+
+    start_time = time.perf_counter()
+    export_animation(recorder.events, "heapsort.gif", fps=20, size=(24, 8), dpi=80)
+    print(f"--- {time.perf_counter() - start_time} seconds for {len(recorder.events)} frames ---")
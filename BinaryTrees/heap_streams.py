@@ -0,0 +1,120 @@
+"""
+Streaming algorithms on top of the binary heap functions.
+
+- top_k: the k largest (or smallest) items of a stream of any length, keeping only
+  a heap of k items in memory.
+- merge_streams: lazy k-way merge of already sorted iterables, yielding each item as
+  soon as it is known to be the next one.
+
+Both accept a key function, computed once per item, and read their inputs in chunks
+of chunk_size items to keep the per-item interpreter overhead low.
+"""
+
+from itertools import islice
+from binary_heap import Max_Heapify_Iterative, Min_Heapify_Iterative
+
+
+def iter_chunks(iterable, chunk_size):
+    """Yield lists of up to chunk_size consecutive items of iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def top_k(iterable, k, key=None, largest=True, chunk_size=1024):
+    """Return the k largest items (k smallest with largest=False) of iterable, best first.
+
+    The heap keeps the k best items seen so far with the worst of them at the root
+    (a min heap for the largest items), so a new item only enters the heap when it
+    beats the root; most items are discarded by a single comparison with it.
+    Equal keys keep their input order. Memory is O(k + chunk_size)."""
+    if k <= 0:
+        return []
+    heapify = Min_Heapify_Iterative if largest else Max_Heapify_Iterative
+    heap = []  # entries (key, tie-break, item)
+    seq = 0
+    for chunk in iter_chunks(iterable, chunk_size):
+        keys = chunk if key is None else list(map(key, chunk))
+        start = 0
+        if len(heap) < k:  # still filling the heap
+            start = min(k - len(heap), len(chunk))
+            for j in range(start):
+                heap.append((keys[j], -(seq + j) if largest else seq + j, chunk[j]))
+            if len(heap) == k:
+                for i in range(k // 2 - 1, -1, -1):
+                    heapify(heap, i, k)
+
+        if len(heap) == k:
+            threshold = heap[0][0]
+            for j in range(start, len(chunk)):
+                kv = keys[j]
+                # An equal key never replaces the root: earlier items win ties
+                if (kv > threshold) if largest else (kv < threshold):
+                    heap[0] = (kv, -(seq + j) if largest else seq + j, chunk[j])
+                    heapify(heap, 0, k)
+                    threshold = heap[0][0]
+        seq += len(chunk)
+
+    heap.sort(key=lambda entry: entry[:2], reverse=largest)
+    return [entry[2] for entry in heap]
+
+
+def merge_streams(*iterables, key=None, chunk_size=1024):
+    """Lazily merge sorted iterables into one sorted stream (stable, like heapq.merge).
+
+    A min heap holds the current head of every stream as (key, stream index). The root
+    is the next item; it is yielded and replaced by the next head of its stream.
+    Items are pulled from each input chunk_size at a time (use chunk_size=1 for
+    inputs that produce items slowly)."""
+    chunks = []    # buffered items of every stream
+    keys = []      # their keys
+    offsets = []   # position of the head of every stream in its chunk
+    iterators = [iter(iterable) for iterable in iterables]
+
+    def refill(s):
+        chunks[s] = list(islice(iterators[s], chunk_size))
+        keys[s] = chunks[s] if key is None else list(map(key, chunks[s]))
+        offsets[s] = 0
+        return len(chunks[s]) > 0
+
+    heap = []
+    for s in range(len(iterators)):
+        chunks.append(None)
+        keys.append(None)
+        offsets.append(0)
+        if refill(s):
+            heap.append((keys[s][0], s))
+    heap_size = len(heap)
+    for i in range(heap_size // 2 - 1, -1, -1):
+        Min_Heapify_Iterative(heap, i, heap_size)
+
+    while heap_size > 0:
+        s = heap[0][1]
+        offset = offsets[s]
+        yield chunks[s][offset]
+
+        offset += 1
+        offsets[s] = offset
+        if offset < len(chunks[s]) or refill(s):
+            heap[0] = (keys[s][offsets[s]], s)
+        else:  # stream s is exhausted: the last entry takes the root
+            heap_size -= 1
+            heap[0] = heap[heap_size]
+            heap.pop()
+        if heap_size > 1:
+            Min_Heapify_Iterative(heap, 0, heap_size)
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(42)
+    stream = (random.randint(0, 10**9) for _ in range(10**6))
+    print("Top 5 of a million random numbers:", top_k(stream, 5))
+
+    streams = [sorted(random.sample(range(100), 10)) for _ in range(3)]
+    print("Streams:", streams)
+    print("Merged:", list(merge_streams(*streams)))
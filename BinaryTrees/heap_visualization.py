@@ -0,0 +1,66 @@
+"""
+Visualization of the binary heap functions with NetworkX and Matplotlib.
+
+visualize_heap is an observer for the functions of binary_heap.py:
+    Heapsort(A, observer=visualize_heap)
+"""
+
+import matplotlib.pyplot as plt
+import networkx as nx
+from binary_heap import Left_Child, Right_Child
+
+
+# ----------------------------------------------------
+# Visualize the heap using NetworkX and Matplotlib
+# ----------------------------------------------------
+def visualize_heap(A, title="", pause=1.0, current_node=None, changed_nodes=None):
+    G = nx.DiGraph()
+    labels = {}
+    
+    # Default values if not provided
+    if changed_nodes is None:
+        changed_nodes = []
+    
+    # Create nodes and edges
+    for i, value in enumerate(A):
+        labels[i] = str(value)
+        left = Left_Child(i)
+        right = Right_Child(i)
+        if left < len(A):
+            G.add_edge(i, left)
+        if right < len(A):
+            G.add_edge(i, right)
+    
+    pos = hierarchy_pos(G, 0)
+    
+    # Determine node colors
+    node_colors = []
+    for i in G.nodes():
+        if i == current_node:
+            node_colors.append('red')  # Current node being evaluated
+        elif i in changed_nodes:
+            node_colors.append('lightgreen')  # Nodes that were changed
+        else:
+            node_colors.append('lightblue')  # Default color
+    
+    plt.clf()
+    nx.draw(G, pos, with_labels=True, labels=labels, node_color=node_colors, 
+            node_size=1200, font_size=15)
+    plt.title(title, fontsize=16)
+    plt.pause(pause)
+
+def hierarchy_pos(G, root, width=1.0, vert_gap=0.2, vert_loc=0, xcenter=0.5):
+    def _hierarchy_pos(G, root, leftmost, width, vert_gap, vert_loc, xcenter, pos=None, parent=None):
+        if pos is None:
+            pos = {root: (xcenter, vert_loc)}
+        else:
+            pos[root] = (xcenter, vert_loc)
+        children = list(G.neighbors(root))
+        if children:
+            dx = width / len(children)
+            nextx = xcenter - width / 2 - dx / 2
+            for child in children:
+                nextx += dx
+                pos = _hierarchy_pos(G, child, leftmost, dx, vert_gap, vert_loc - vert_gap, nextx, pos, root)
+        return pos
+    return _hierarchy_pos(G, root, 0, width, vert_gap, vert_loc, xcenter)
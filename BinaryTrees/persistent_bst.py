@@ -0,0 +1,208 @@
+"""
+Persistent (path-copying) weight-balanced binary search tree.
+
+The nodes of a persistent tree are never modified after they are created. An insert
+or a delete copies only the nodes on the path from the root to the changed position,
+and the new copies point to the untouched subtrees of the previous version. Every
+version is the root of a complete, valid BST that shares most of its nodes with the
+other versions, so old versions stay queryable, and a reader holding a version is
+never affected by later changes.
+
+The copies on the path are rebalanced as they are built, by weight (subtree sizes,
+which every node stores anyway): neither subtree of a node may have more than DELTA
+times as many nodes as the other, or a single or double rotation of the copied nodes
+restores the balance (Adams' trees, with the parameters (3, 2) of Haskell's
+Data.Map). The height stays O(log n) whatever the order of the updates, even for
+increasing keys, so an insert or a delete copies O(log n) nodes.
+
+Since a node can belong to many versions it cannot have a single parent: the nodes
+have no parent pointer. The functions of binary_search_tree.py that only walk down
+from the root (iterative_tree_search, tree_minimum, tree_maximum, tree_rank,
+tree_select, tree_count_range, tree_items) and plot_tree_states work on the versions
+directly; tree_successor and tree_predecessor do not.
+"""
+
+from binary_search_tree import (iterative_tree_search, tree_minimum, tree_maximum, tree_size,
+                                tree_rank, tree_select, tree_count_range, tree_items)
+
+# Weight balance: a subtree may have at most DELTA times as many nodes as its sibling;
+# a rotation is double when the inner grandchild has at least RATIO times the outer one
+DELTA, RATIO = 3, 2
+
+
+class PNode:
+    """Immutable BST node: key, children and subtree size, no parent."""
+    __slots__ = ('key', 'left', 'right', 'size')
+
+    def __init__(self, key, left=None, right=None):
+        self.key = key
+        self.left = left
+        self.right = right
+        self.size = tree_size(left) + tree_size(right) + 1
+
+
+def _balance(key, left, right):
+    """Return a new node with key and the given subtrees, rotated if they are unbalanced.
+
+    left and right must be balanced trees whose sizes were balanced before one of them
+    gained or lost a node, as on the path of an insert or a delete."""
+    size_left, size_right = tree_size(left), tree_size(right)
+    if size_left + size_right <= 1:
+        return PNode(key, left, right)
+    if size_right > DELTA * size_left:
+        inner, outer = right.left, right.right
+        if tree_size(inner) < RATIO * tree_size(outer):  # single left rotation
+            return PNode(right.key, PNode(key, left, inner), outer)
+        return PNode(inner.key, PNode(key, left, inner.left),  # double rotation
+                     PNode(right.key, inner.right, outer))
+    if size_left > DELTA * size_right:
+        inner, outer = left.right, left.left
+        if tree_size(inner) < RATIO * tree_size(outer):  # single right rotation
+            return PNode(left.key, outer, PNode(key, inner, right))
+        return PNode(inner.key, PNode(left.key, outer, inner.left),
+                     PNode(key, inner.right, right))
+    return PNode(key, left, right)
+
+
+def persistent_from_sorted(keys):
+    """Return the root of a perfectly balanced tree built from sorted keys, in O(n)."""
+    def build(lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        return PNode(keys[mid], build(lo, mid), build(mid + 1, hi))
+    return build(0, len(keys))
+
+
+def _rebuild_path(path, key, node):
+    """Copy the nodes of path (from the root down) above the new subtree node, rebalancing.
+
+    Each copy keeps the child that is not on the path; key tells which side was taken."""
+    for parent in reversed(path):
+        if key < parent.key:
+            node = _balance(parent.key, node, parent.right)
+        else:
+            node = _balance(parent.key, parent.left, node)
+    return node
+
+
+def persistent_insert(root, key):
+    """Return the root of a new version with key inserted (equal keys go right), in O(log n)."""
+    path = []
+    node = root
+    while node is not None:
+        path.append(node)
+        node = node.left if key < node.key else node.right
+    return _rebuild_path(path, key, PNode(key))
+
+
+def _delete_minimum(node):
+    """Return (root of a copy of the subtree without its minimum, the minimum node)."""
+    path = []
+    while node.left is not None:
+        path.append(node)
+        node = node.left
+    new = node.right
+    for parent in reversed(path):
+        new = _balance(parent.key, new, parent.right)
+    return new, node
+
+
+def persistent_delete(root, key):
+    """Return the root of a new version without one node with key, in O(log n).
+
+    As in tree_delete, a node with two children is replaced by its successor (here a
+    new node with the successor's key). Raises KeyError if the key is not present."""
+    path = []
+    node = root
+    while node is not None and key != node.key:
+        path.append(node)
+        node = node.left if key < node.key else node.right
+    if node is None:
+        raise KeyError(key)
+
+    if node.left is None:
+        new = node.right
+    elif node.right is None:
+        new = node.left
+    else:
+        right, successor = _delete_minimum(node.right)
+        new = _balance(successor.key, node.left, right)
+    return _rebuild_path(path, key, new)
+
+
+class PersistentTree:
+    """Sequence of versions of a BST; each insert or delete adds a version.
+
+    versions[0] is the empty tree (None) and versions[-1] the current one. The query
+    methods take an optional version number (the current version by default)."""
+
+    def __init__(self, keys=()):
+        self.versions = [None]
+        for key in keys:
+            self.insert(key)
+
+    @property
+    def root(self):
+        return self.versions[-1]
+
+    def __len__(self):
+        return tree_size(self.root)
+
+    def __contains__(self, key):
+        return iterative_tree_search(self.root, key) is not None
+
+    def __iter__(self):
+        return tree_items(self.root)
+
+    def insert(self, key):
+        """Insert key in a new version and return the number of that version."""
+        self.versions.append(persistent_insert(self.root, key))
+        return len(self.versions) - 1
+
+    def delete(self, key):
+        """Delete key in a new version and return the number of that version."""
+        self.versions.append(persistent_delete(self.root, key))
+        return len(self.versions) - 1
+
+    def search(self, key, version=-1):
+        return iterative_tree_search(self.versions[version], key)
+
+    def minimum(self, version=-1):
+        root = self.versions[version]
+        return None if root is None else tree_minimum(root)
+
+    def maximum(self, version=-1):
+        root = self.versions[version]
+        return None if root is None else tree_maximum(root)
+
+    def rank(self, key, version=-1):
+        return tree_rank(self.versions[version], key)
+
+    def select(self, i, version=-1):
+        return tree_select(self.versions[version], i)
+
+    def count_range(self, lo, hi, version=-1):
+        return tree_count_range(self.versions[version], lo, hi)
+
+    def items(self, lo=None, hi=None, reverse=False, version=-1):
+        return tree_items(self.versions[version], lo, hi, reverse)
+
+
+if __name__ == '__main__':
+    import random
+    from binary_search_tree import plot_tree_states
+
+    random.seed(42)
+    tree = PersistentTree(random.sample(range(40), 15))
+    k = 28
+    inserted = tree.insert(k)
+    deleted = tree.delete(tree.versions[inserted].key)  # delete the root
+
+    for version in (inserted - 1, inserted, deleted):
+        print(f"Version {version}:", list(tree.items(version=version)))
+
+    plot_tree_states(
+        [tree.versions[inserted - 1], tree.versions[inserted], tree.versions[deleted]],
+        ["Initial Tree", f"After Inserting {k}", "After Deleting the Root"]
+    )
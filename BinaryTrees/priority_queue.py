@@ -0,0 +1,145 @@
+"""
+Indexed priority queue built on the binary heap index functions.
+
+The heap is kept in two parallel arrays (the items and their priorities) and a
+position map gives the index in the heap of every item. This way an item can be
+found in O(1), so changing its priority or removing it is a single sift up or down,
+O(log n), instead of a linear search or rebuilding the heap.
+
+The items are their own handles (like the vertices in Dijkstra's algorithm), so they
+must be hashable and unique in the queue.
+"""
+
+from binary_heap import Parent, Left_Child
+
+
+class IndexedPriorityQueue:
+    """Array-backed priority queue with push, pop, peek, update and remove in O(log n).
+
+    With max_heap=False (default) the item with the smallest priority comes out
+    first, with max_heap=True the one with the largest priority."""
+
+    def __init__(self, max_heap=False):
+        self.max_heap = max_heap
+        self.items = []       # heap of items
+        self.priorities = []  # priorities[i] is the priority of items[i]
+        self.position = {}    # item -> index in the heap
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def _before(self, p, q):
+        """True if priority p must come out before priority q."""
+        return p > q if self.max_heap else p < q
+
+    def _place(self, i, item, priority):
+        self.items[i] = item
+        self.priorities[i] = priority
+        self.position[item] = i
+
+    def _sift_up(self, i):
+        """Move the node at index i up until its parent comes out before it."""
+        item, priority = self.items[i], self.priorities[i]
+        while i > 0:
+            p = Parent(i)
+            if not self._before(priority, self.priorities[p]):
+                break
+            self._place(i, self.items[p], self.priorities[p])
+            i = p
+        self._place(i, item, priority)
+
+    def _sift_down(self, i):
+        """Move the node at index i down until it comes out before its children."""
+        n = len(self.items)
+        item, priority = self.items[i], self.priorities[i]
+        while True:
+            l = Left_Child(i)
+            if l >= n:
+                break
+            r = l + 1
+            child = r if r < n and self._before(self.priorities[r], self.priorities[l]) else l
+            if not self._before(self.priorities[child], priority):
+                break
+            self._place(i, self.items[child], self.priorities[child])
+            i = child
+        self._place(i, item, priority)
+
+    def push(self, item, priority):
+        """Insert item with the given priority."""
+        if item in self.position:
+            raise ValueError(f"{item!r} is already in the queue")
+        self.items.append(item)
+        self.priorities.append(priority)
+        self.position[item] = len(self.items) - 1
+        self._sift_up(len(self.items) - 1)
+
+    def peek(self):
+        """Return (item, priority) of the item that comes out first, without removing it."""
+        if not self.items:
+            raise IndexError("peek from an empty priority queue")
+        return self.items[0], self.priorities[0]
+
+    def pop(self):
+        """Remove and return (item, priority) of the item that comes out first."""
+        if not self.items:
+            raise IndexError("pop from an empty priority queue")
+        return self._remove_at(0)
+
+    def priority(self, item):
+        """Return the priority of item."""
+        return self.priorities[self.position[item]]
+
+    def update(self, item, priority):
+        """Change the priority of item (decrease-key or increase-key)."""
+        i = self.position[item]
+        old = self.priorities[i]
+        self.priorities[i] = priority
+        if self._before(priority, old):
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, item):
+        """Remove item from the queue and return its priority."""
+        return self._remove_at(self.position[item])[1]
+
+    def _remove_at(self, i):
+        """Remove the node at index i: the last node takes its place and is sifted."""
+        item, priority = self.items[i], self.priorities[i]
+        del self.position[item]
+        last_item, last_priority = self.items.pop(), self.priorities.pop()
+        if i < len(self.items):
+            self._place(i, last_item, last_priority)
+            if i > 0 and self._before(last_priority, self.priorities[Parent(i)]):
+                self._sift_up(i)
+            else:
+                self._sift_down(i)
+        return item, priority
+
+
+if __name__ == "__main__":
+    # Dijkstra's shortest paths with decrease-key
+    graph = {
+        'a': {'b': 7, 'c': 9, 'f': 14},
+        'b': {'a': 7, 'c': 10, 'd': 15},
+        'c': {'a': 9, 'b': 10, 'd': 11, 'f': 2},
+        'd': {'b': 15, 'c': 11, 'e': 6},
+        'e': {'d': 6, 'f': 9},
+        'f': {'a': 14, 'c': 2, 'e': 9},
+    }
+    distance = {'a': 0}
+    queue = IndexedPriorityQueue()
+    queue.push('a', 0)
+    while queue:
+        u, d = queue.pop()
+        for v, w in graph[u].items():
+            if v not in distance:
+                queue.push(v, d + w)
+                distance[v] = d + w
+            elif v in queue and d + w < distance[v]:
+                queue.update(v, d + w)  # decrease-key
+                distance[v] = d + w
+    print("Distances from a:", distance)
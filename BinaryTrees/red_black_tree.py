@@ -0,0 +1,346 @@
+"""
+Red-black tree implementation in Python.
+
+A red-black tree is a BST with one extra bit per node, its color (red or black),
+that keeps the tree approximately balanced: no path from the root to a leaf is more
+than twice as long as any other, so the height is at most 2 log(n + 1).
+
+Red-black properties (the None leaves count as black nodes):
+1. Every node is either red or black.
+2. The root is black.
+3. If a node is red, both its children are black.
+4. For each node, all paths from the node to its descendant leaves contain the
+   same number of black nodes (the black-height of the node).
+
+After an insertion or a deletion the properties are restored by recoloring nodes
+and by rotations, in O(log n). The nodes are BST nodes, so the functions of
+binary_search_tree.py (tree_search, tree_minimum, tree_successor, ...) work on them.
+The subtree sizes are kept up to date through the rotations, so rank, select and
+count_range are O(log n) as well.
+"""
+
+import random
+from binary_search_tree import (Node, iterative_tree_search, tree_minimum, tree_maximum,
+                                tree_successor, tree_predecessor, tree_size, tree_rank,
+                                tree_select, tree_count_range, tree_items)
+
+RED = 'red'
+BLACK = 'black'
+
+
+class RBNode(Node):
+    def __init__(self, key, color=RED):
+        super().__init__(key)
+        self.color = color
+
+
+def color(node):
+    """Color of a node; the None leaves are black."""
+    return BLACK if node is None else node.color
+
+
+class RedBlackTree:
+    """Balanced BST that owns its root: insert, delete and search in O(log n)."""
+
+    def __init__(self, keys=()):
+        self.root = None
+        self.size = 0
+        for key in keys:
+            self.insert(key)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return self.search(key) is not None
+
+    def __iter__(self):
+        """Keys in sorted order."""
+        return tree_items(self.root)
+
+    def __reversed__(self):
+        return tree_items(self.root, reverse=True)
+
+    def items(self, lo=None, hi=None, reverse=False):
+        """Keys k with lo <= k < hi, lazily, in sorted order (decreasing with reverse=True)."""
+        return tree_items(self.root, lo, hi, reverse)
+
+    # ------------------ Queries ------------------ #
+
+    def search(self, key):
+        """Returns a node with the key if one exists, otherwise None."""
+        return iterative_tree_search(self.root, key)
+
+    def minimum(self):
+        return None if self.root is None else tree_minimum(self.root)
+
+    def maximum(self):
+        return None if self.root is None else tree_maximum(self.root)
+
+    def successor(self, node):
+        return tree_successor(node)
+
+    def predecessor(self, node):
+        return tree_predecessor(node)
+
+    def rank(self, key):
+        """Number of keys less than key."""
+        return tree_rank(self.root, key)
+
+    def select(self, i):
+        """Node with the i-th smallest key (from 0)."""
+        return tree_select(self.root, i)
+
+    def count_range(self, lo, hi):
+        """Number of keys k with lo <= k < hi."""
+        return tree_count_range(self.root, lo, hi)
+
+    # ------------------ Rotations ------------------ #
+
+    def left_rotate(self, x):
+        """Turn x's right child y into the parent of x (y's left subtree becomes x's right)."""
+        y = x.right
+        x.right = y.left
+        if y.left is not None:
+            y.left.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x is x.parent.left:
+            x.parent.left = y
+        else:
+            x.parent.right = y
+        y.left = x
+        x.parent = y
+        y.size = x.size
+        x.size = tree_size(x.left) + tree_size(x.right) + 1
+
+    def right_rotate(self, x):
+        """Mirror of left_rotate: x's left child becomes the parent of x."""
+        y = x.left
+        x.left = y.right
+        if y.right is not None:
+            y.right.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x is x.parent.right:
+            x.parent.right = y
+        else:
+            x.parent.left = y
+        y.right = x
+        x.parent = y
+        y.size = x.size
+        x.size = tree_size(x.left) + tree_size(x.right) + 1
+
+    # ------------------ Insertion ------------------ #
+
+    def insert(self, key):
+        """Insert key (as in tree_insert, equal keys go right) and return its node."""
+        z = RBNode(key)
+        y = None
+        x = self.root
+        while x is not None:
+            y = x
+            x.size += 1
+            x = x.left if z.key < x.key else x.right
+        z.parent = y
+        if y is None:
+            self.root = z  # tree was empty
+        elif z.key < y.key:
+            y.left = z
+        else:
+            y.right = z
+        self.size += 1
+        self._insert_fixup(z)
+        return z
+
+    def _insert_fixup(self, z):
+        """Restore the properties after inserting the red node z.
+
+        While z's parent is red (property 3 broken):
+        1. z's uncle is red: recolor parent and uncle black, grandparent red, move up.
+        2. z's uncle is black and z is an inner child: rotate it to the outside.
+        3. z's uncle is black and z is an outer child: recolor and rotate the grandparent."""
+        while color(z.parent) == RED:
+            p = z.parent
+            g = p.parent
+            if p is g.left:
+                uncle = g.right
+                if color(uncle) == RED:  # case 1
+                    p.color = uncle.color = BLACK
+                    g.color = RED
+                    z = g
+                else:
+                    if z is p.right:  # case 2
+                        z = p
+                        self.left_rotate(z)
+                        p = z.parent
+                    p.color = BLACK  # case 3
+                    g.color = RED
+                    self.right_rotate(g)
+            else:
+                uncle = g.left
+                if color(uncle) == RED:
+                    p.color = uncle.color = BLACK
+                    g.color = RED
+                    z = g
+                else:
+                    if z is p.left:
+                        z = p
+                        self.right_rotate(z)
+                        p = z.parent
+                    p.color = BLACK
+                    g.color = RED
+                    self.left_rotate(g)
+        self.root.color = BLACK
+
+    # ------------------ Deletion ------------------ #
+
+    def _transplant(self, u, v):
+        """Replaces the subtree rooted at u with the subtree rooted at v."""
+        if u.parent is None:
+            self.root = v
+        elif u is u.parent.left:
+            u.parent.left = v
+        else:
+            u.parent.right = v
+        if v is not None:
+            v.parent = u.parent
+
+    def delete(self, z):
+        """Delete the node z from the tree (as in tree_delete, then rebalance)."""
+        y_color = z.color
+        removed = z if z.left is None or z.right is None else tree_minimum(z.right)
+        x = removed.parent  # one node less in every subtree above the removed position
+        while x is not None:
+            x.size -= 1
+            x = x.parent
+
+        if z.left is None:
+            x, x_parent = z.right, z.parent
+            self._transplant(z, z.right)
+        elif z.right is None:
+            x, x_parent = z.left, z.parent
+            self._transplant(z, z.left)
+        else:
+            y = removed  # successor of z takes its place
+            y_color = y.color
+            x = y.right
+            if y.parent is z:
+                x_parent = y
+            else:
+                x_parent = y.parent
+                self._transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+            self._transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+            y.color = z.color
+            y.size = z.size
+        z.left = z.right = z.parent = None
+        z.size = 1
+        self.size -= 1
+        if y_color == BLACK:
+            self._delete_fixup(x, x_parent)
+
+    def remove(self, key):
+        """Delete a node with the key; raise KeyError if there is none."""
+        node = self.search(key)
+        if node is None:
+            raise KeyError(key)
+        self.delete(node)
+
+    def _delete_fixup(self, x, parent):
+        """Restore the properties after removing a black node.
+
+        x (possibly None, so its parent is passed along) carries an extra black.
+        With w the sibling of x:
+        1. w is red: recolor and rotate so that w becomes black.
+        2. w is black with two black children: recolor w red and move x up.
+        3. w is black, its outer child black: rotate w so that its outer child is red.
+        4. w is black, its outer child red: recolor and rotate the parent, done."""
+        while x is not self.root and color(x) == BLACK:
+            if x is parent.left:
+                w = parent.right
+                if color(w) == RED:  # case 1
+                    w.color = BLACK
+                    parent.color = RED
+                    self.left_rotate(parent)
+                    w = parent.right
+                if color(w.left) == BLACK and color(w.right) == BLACK:  # case 2
+                    w.color = RED
+                    x, parent = parent, parent.parent
+                else:
+                    if color(w.right) == BLACK:  # case 3
+                        w.left.color = BLACK
+                        w.color = RED
+                        self.right_rotate(w)
+                        w = parent.right
+                    w.color = parent.color  # case 4
+                    parent.color = BLACK
+                    w.right.color = BLACK
+                    self.left_rotate(parent)
+                    x, parent = self.root, None
+            else:
+                w = parent.left
+                if color(w) == RED:
+                    w.color = BLACK
+                    parent.color = RED
+                    self.right_rotate(parent)
+                    w = parent.left
+                if color(w.left) == BLACK and color(w.right) == BLACK:
+                    w.color = RED
+                    x, parent = parent, parent.parent
+                else:
+                    if color(w.left) == BLACK:
+                        w.right.color = BLACK
+                        w.color = RED
+                        self.left_rotate(w)
+                        w = parent.left
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.left.color = BLACK
+                    self.right_rotate(parent)
+                    x, parent = self.root, None
+        if x is not None:
+            x.color = BLACK
+
+
+def black_height(node):
+    """Check the red-black properties (and the subtree sizes) below node and return its black-height.
+
+    Raises ValueError if a property is violated."""
+    if node is None:
+        return 1
+    for child in (node.left, node.right):
+        if child is not None and child.parent is not node:
+            raise ValueError(f"broken parent pointer below {node.key}")
+    if node.size != tree_size(node.left) + tree_size(node.right) + 1:
+        raise ValueError(f"wrong subtree size at {node.key}")
+    if node.color == RED and (color(node.left) == RED or color(node.right) == RED):
+        raise ValueError(f"red node {node.key} has a red child")
+    left, right = black_height(node.left), black_height(node.right)
+    if left != right:
+        raise ValueError(f"different black-heights below {node.key}")
+    return left + (node.color == BLACK)
+
+
+if __name__ == '__main__':
+    # Sorted keys make tree_insert build a linked list, but the red-black tree stays balanced
+    n = 100000
+    tree = RedBlackTree(range(n))
+
+    def height(node):
+        depth, level = 0, [node]
+        while level:
+            depth += 1
+            level = [c for x in level for c in (x.left, x.right) if c is not None]
+        return depth
+
+    print(f"{n} sorted keys: height {height(tree.root)}, black-height {black_height(tree.root)}")
+    for key in random.sample(range(n), n // 2):
+        tree.remove(key)
+    print(f"After deleting half of them: {len(tree)} keys, height {height(tree.root)}")
+    print("Minimum:", tree.minimum().key, "Maximum:", tree.maximum().key)
@@ -0,0 +1,503 @@
+import random
+import pytest
+from binary_search_tree import (Node, tree_insert, tree_delete, tree_search, tree_minimum,
+                                tree_maximum, tree_successor, tree_predecessor)
+from red_black_tree import RedBlackTree, black_height
+
+def inorder_keys(node):
+    keys = []
+    stack = []
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        keys.append(node.key)
+        node = node.right
+    return keys
+
+def build_tree(keys):
+    root = None
+    for key in keys:
+        root = tree_insert(root, Node(key))
+    return root
+
+def test_tree_insert_and_search():
+    keys = [20, 10, 30, 5, 15, 25, 35, 15]
+    root = build_tree(keys)
+    assert root.key == 20
+    assert inorder_keys(root) == sorted(keys)
+    assert tree_search(root, 25).key == 25
+    assert tree_search(root, 26) is None
+    assert tree_minimum(root).key == 5
+    assert tree_maximum(root).key == 35
+    assert tree_successor(tree_search(root, 20)).key == 25
+    assert tree_predecessor(tree_search(root, 20)).key == 15
+
+def test_tree_delete_updates_root():
+    root = build_tree([20, 10, 30])
+    root = tree_delete(root, root)
+    assert root.key == 30 and root.parent is None
+    assert inorder_keys(root) == [10, 30]
+    root = tree_delete(root, tree_search(root, 30))
+    root = tree_delete(root, root)
+    assert root is None
+
+def test_tree_delete_random():
+    random.seed(0)
+    keys = [random.randint(0, 100) for _ in range(200)]
+    root = build_tree(keys)
+    for key in random.sample(keys, 150):
+        root = tree_delete(root, tree_search(root, key))
+        keys.remove(key)
+        assert inorder_keys(root) == sorted(keys)
+
+def test_red_black_tree_sorted_inserts_stay_balanced():
+    n = 10000
+    tree = RedBlackTree(range(n))
+    assert len(tree) == n
+    assert list(tree) == list(range(n))
+    assert black_height(tree.root) <= 15  # height <= 2 log(n + 1)
+    assert tree.minimum().key == 0 and tree.maximum().key == n - 1
+    assert tree.successor(tree.search(41)).key == 42
+    assert tree.predecessor(tree.search(41)).key == 40
+
+def test_red_black_tree_random_operations():
+    random.seed(1)
+    tree = RedBlackTree()
+    keys = []
+    for _ in range(3000):
+        if keys and random.random() < 0.4:
+            key = random.choice(keys)
+            tree.remove(key)
+            keys.remove(key)
+        else:
+            key = random.randint(0, 500)  # with duplicates
+            tree.insert(key)
+            keys.append(key)
+    black_height(tree.root)
+    assert tree.root is None or tree.root.color == 'black'
+    assert list(tree) == sorted(keys)
+    assert len(tree) == len(keys)
+    assert (501 in tree) is False
+
+def test_red_black_tree_delete_all():
+    tree = RedBlackTree([5, 3, 8, 1, 4, 7, 9])
+    for key in [5, 1, 9, 3, 8, 4, 7]:
+        tree.remove(key)
+        black_height(tree.root)
+    assert tree.root is None and len(tree) == 0
+    assert tree.minimum() is None
+
+def test_slot_node_works_with_tree_functions():
+    from compact_bst import SlotNode
+    root = None
+    for key in [5, 2, 8, 2, 9]:
+        root = tree_insert(root, SlotNode(key))
+    assert not hasattr(root, '__dict__')
+    root = tree_delete(root, root)
+    assert inorder_keys(root) == [2, 2, 8, 9]
+
+def test_compact_bst_matches_node_tree():
+    from compact_bst import CompactBST, NIL
+    random.seed(2)
+    tree = CompactBST(capacity=4, typecode='q')
+    keys = []
+    for _ in range(2000):
+        if keys and random.random() < 0.4:
+            key = random.choice(keys)
+            tree.remove(key)
+            keys.remove(key)
+        else:
+            key = random.randint(0, 300)
+            tree.insert(key)
+            keys.append(key)
+    assert list(tree) == sorted(keys)
+    assert len(tree) == len(keys)
+    assert tree.used <= 1200  # deleted slots were reused
+    assert tree.key[tree.minimum(tree.root)] == min(keys)
+    assert tree.key[tree.maximum(tree.root)] == max(keys)
+    assert tree.search(301) == NIL
+    i, backwards = tree.maximum(tree.root), []
+    while i != NIL:
+        backwards.append(tree.key[i])
+        i = tree.predecessor(i)
+    assert backwards == sorted(keys, reverse=True)
+
+def test_compact_bst_free_list():
+    from compact_bst import CompactBST
+    tree = CompactBST(capacity=2)
+    a, b, c = tree.insert(2.0), tree.insert(1.0), tree.insert(3.0)
+    tree.delete(b)
+    tree.delete(a)
+    assert tree.insert(7.0) == a  # last freed slot first
+    assert tree.insert(0.5) == b
+    assert tree.insert(9.0) == 3
+    assert list(tree) == [0.5, 3.0, 7.0, 9.0]
+
+def height(node):
+    if node is None:
+        return 0
+    return 1 + max(height(node.left), height(node.right))
+
+def check_parents(node):
+    for child in (node.left, node.right):
+        if child is not None:
+            assert child.parent is node
+            check_parents(child)
+
+def test_tree_bulk_load():
+    from binary_search_tree import tree_bulk_load, tree_from_sorted, tree_nodes
+    random.seed(3)
+    keys = [random.randint(0, 1000) for _ in range(1023)]
+    root = tree_bulk_load(keys)
+    assert root.parent is None
+    check_parents(root)
+    assert inorder_keys(root) == sorted(keys)
+    assert [node.key for node in tree_nodes(root)] == sorted(keys)
+    assert height(root) == 10  # perfectly balanced
+    assert tree_search(root, keys[7]) is not None
+
+    root = tree_from_sorted(range(100000))
+    assert height(root) == 17
+    assert tree_successor(tree_search(root, 41)).key == 42
+    assert tree_bulk_load([]) is None
+    assert tree_bulk_load([3.5]).key == 3.5
+    # The nodes hold the caller's keys: ints stay ints, tuples and numeric arrays work
+    keys = [3, 1.5, 2]
+    assert [type(node.key) for node in tree_nodes(tree_bulk_load(keys))] == [float, int, int]
+    pairs = [(2, 'b'), (1, 'z'), (2, 'a')]
+    assert [node.key for node in tree_nodes(tree_bulk_load(pairs))] == sorted(pairs)
+    import numpy as np
+    assert inorder_keys(tree_bulk_load(np.array([5, 3, 4]))) == [3, 4, 5]
+
+def test_tree_merge():
+    from binary_search_tree import tree_merge, tree_nodes
+    random.seed(4)
+    a = [random.randint(0, 100) for _ in range(300)]
+    b = [random.randint(0, 100) for _ in range(200)]
+    root_a, root_b = build_tree(a), build_tree(b)
+    nodes_a = tree_nodes(root_a)
+    root = tree_merge(root_a, root_b)
+    check_parents(root)
+    assert root.parent is None
+    assert inorder_keys(root) == sorted(a + b)
+    assert height(root) == 9
+    # Nodes are relinked, and equal keys of the first tree come first
+    merged = tree_nodes(root)
+    assert set(map(id, nodes_a)) <= set(map(id, merged))
+    first_50 = [node for node in merged if node.key == 50]
+    assert first_50 == [node for node in nodes_a if node.key == 50] + \
+        [node for node in first_50 if node not in nodes_a]
+    assert inorder_keys(tree_merge(None, build_tree([2, 1]))) == [1, 2]
+    assert tree_merge(None, None) is None
+    pairs = tree_merge(build_tree([(1, 'a'), (3, 'c')]), build_tree([(2, 'b')]))
+    assert inorder_keys(pairs) == [(1, 'a'), (2, 'b'), (3, 'c')]
+
+def check_sizes(node):
+    if node is None:
+        return 0
+    size = check_sizes(node.left) + check_sizes(node.right) + 1
+    assert node.size == size
+    return size
+
+def test_order_statistics():
+    from binary_search_tree import tree_rank, tree_select, tree_count_range, tree_bulk_load
+    random.seed(5)
+    keys = [random.randint(0, 200) for _ in range(500)]
+    root = build_tree(keys)
+    for key in random.sample(keys, 250):
+        root = tree_delete(root, tree_search(root, key))
+        keys.remove(key)
+        check_sizes(root)
+    keys.sort()
+    for root in (root, tree_bulk_load(keys)):
+        check_sizes(root)
+        assert [tree_select(root, i).key for i in range(len(keys))] == keys
+        for key in range(-1, 202, 7):
+            assert tree_rank(root, key) == sum(k < key for k in keys)
+            assert tree_count_range(root, key, key + 30) == sum(key <= k < key + 30 for k in keys)
+        assert tree_count_range(root, 50, 10) == 0
+    with pytest.raises(IndexError):
+        tree_select(root, len(keys))
+
+def test_red_black_tree_order_statistics():
+    random.seed(6)
+    tree = RedBlackTree()
+    keys = []
+    for _ in range(2000):
+        if keys and random.random() < 0.4:
+            key = random.choice(keys)
+            tree.remove(key)
+            keys.remove(key)
+        else:
+            key = random.randint(0, 300)
+            tree.insert(key)
+            keys.append(key)
+    black_height(tree.root)  # also checks the subtree sizes
+    keys.sort()
+    assert tree.root.size == len(tree)
+    assert tree.select(len(keys) // 2).key == keys[len(keys) // 2]
+    assert tree.rank(150) == sum(k < 150 for k in keys)
+    assert tree.count_range(100, 200) == sum(100 <= k < 200 for k in keys)
+
+def test_tree_items():
+    from binary_search_tree import tree_items, iter_nodes
+    random.seed(7)
+    keys = [random.randint(0, 100) for _ in range(400)]
+    root = build_tree(keys)
+    keys.sort()
+    assert list(tree_items(root)) == keys
+    assert list(tree_items(root, reverse=True)) == keys[::-1]
+    for lo, hi in [(10, 20), (None, 30), (50, None), (40, 40), (60, 50), (-5, 200), (101, 105)]:
+        expected = [k for k in keys if (lo is None or lo <= k) and (hi is None or k < hi)]
+        assert list(tree_items(root, lo, hi)) == expected
+        assert list(tree_items(root, lo, hi, reverse=True)) == expected[::-1]
+    nodes = list(iter_nodes(root, 20, 30))
+    assert all(isinstance(x, Node) for x in nodes)
+    assert [x.key for x in nodes] == [k for k in keys if 20 <= k < 30]
+    assert list(tree_items(None)) == []
+
+def test_tree_items_is_lazy_on_deep_trees():
+    from binary_search_tree import tree_items
+    root = build_tree(range(5000))  # a linked list: recursion would fail
+    items = tree_items(root, 100)
+    assert [next(items) for _ in range(3)] == [100, 101, 102]
+    assert next(tree_items(root, reverse=True)) == 4999
+
+def test_red_black_tree_items():
+    tree = RedBlackTree(range(0, 100, 3))
+    assert list(tree.items(10, 20)) == [12, 15, 18]
+    assert list(tree.items(10, 20, reverse=True)) == [18, 15, 12]
+    assert list(reversed(tree))[:2] == [99, 96]
+
+def all_nodes(node):
+    if node is None:
+        return []
+    return [node] + all_nodes(node.left) + all_nodes(node.right)
+
+def test_persistent_tree_versions():
+    from persistent_bst import PersistentTree
+    random.seed(8)
+    tree = PersistentTree()
+    history = [[]]
+    for _ in range(600):
+        keys = list(history[-1])
+        if keys and random.random() < 0.4:
+            key = random.choice(keys)
+            tree.delete(key)
+            keys.remove(key)
+        else:
+            key = random.randint(0, 100)
+            tree.insert(key)
+            keys.append(key)
+        history.append(sorted(keys))
+    # Every old version is still intact
+    for version, keys in enumerate(history):
+        assert list(tree.items(version=version)) == keys
+        check_sizes(tree.versions[version])
+    assert len(tree) == len(history[-1])
+    assert tree.select(0).key == history[-1][0]
+    assert tree.rank(50, version=100) == sum(k < 50 for k in history[100])
+    with pytest.raises(KeyError):
+        tree.delete(1000)
+
+def test_persistent_tree_shares_nodes():
+    from persistent_bst import PersistentTree
+    tree = PersistentTree(random.Random(9).sample(range(1000), 500))
+    old = set(map(id, all_nodes(tree.root)))
+    for version_op in (lambda: tree.insert(1001), lambda: tree.delete(tree.root.key)):
+        before = tree.root
+        version_op()
+        new = [x for x in all_nodes(tree.root) if id(x) not in old]
+        # Only the path was copied (a rotation makes at most 2 more nodes per level)
+        assert len(new) <= 3 * (height(before) + 1)
+        old |= set(map(id, new))
+
+def check_weight_balance(node):
+    from persistent_bst import DELTA
+    if node is None:
+        return 0
+    size_left, size_right = check_weight_balance(node.left), check_weight_balance(node.right)
+    assert size_left + size_right <= 1 or (size_left <= DELTA * size_right and
+                                           size_right <= DELTA * size_left)
+    return size_left + size_right + 1
+
+def test_persistent_tree_monotonic_keys():
+    import math
+    from persistent_bst import PersistentTree
+    from concurrent_bst import ConcurrentTree
+    tree = ConcurrentTree(range(1000))
+    for key in range(1000, 6000):  # increasing keys, as in an append-only index
+        tree.insert(key)
+    root = tree.snapshot().root
+    check_weight_balance(root)
+    assert height(root) <= 2 * math.log2(6000 + 1)
+    for key in range(5999, 1999, -1):  # and deleted from the end
+        tree.delete(key)
+    check_weight_balance(tree.snapshot().root)
+    assert list(tree) == list(range(2000))
+
+    persistent = PersistentTree(range(2000))
+    check_weight_balance(persistent.root)
+    assert height(persistent.root) <= 2 * math.log2(2000 + 1)
+
+def test_concurrent_tree_stress():
+    import threading
+    from concurrent_bst import ConcurrentTree
+    tree = ConcurrentTree(range(0, 200, 2))
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        rng = random.Random(10)
+        present = []
+        try:
+            for _ in range(1500):
+                # Each update inserts or deletes a pair (k, k + 1) atomically
+                if present and rng.random() < 0.5:
+                    k = present.pop(rng.randrange(len(present)))
+                    tree.update(delete=(k, k + 1))
+                else:
+                    k = 2 * rng.randrange(1000) + 1000
+                    while k in present:
+                        k = 2 * rng.randrange(1000) + 1000
+                    tree.update(insert=(k, k + 1))
+                    present.append(k)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()  # the readers stop even if the writer fails
+
+    def reader():
+        last_version = -1
+        try:
+            while not done.is_set():
+                snapshot = tree.snapshot()
+                assert snapshot.version >= last_version
+                last_version = snapshot.version
+                keys = list(snapshot)
+                assert keys == sorted(keys)
+                assert len(keys) == len(snapshot)
+                pairs = [k for k in keys if k >= 1000]
+                assert len(pairs) % 2 == 0
+                assert all(pairs[i] + 1 == pairs[i + 1] for i in range(0, len(pairs), 2))
+                check_sizes(snapshot.root)
+                assert snapshot.search(100) is not None
+                assert snapshot.successor(100).key == 102
+        except Exception as e:  # not only failed asserts: any error of a snapshot query
+            errors.append(e)
+            done.set()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert tree.snapshot().version == 1500
+
+def test_concurrent_tree_queries():
+    from concurrent_bst import ConcurrentTree
+    tree = ConcurrentTree([5, 1, 9, 3])
+    old = tree.snapshot()
+    tree.insert(7)
+    tree.delete(1)
+    assert list(old) == [1, 3, 5, 9]
+    assert list(tree) == [3, 5, 7, 9]
+    assert tree.predecessor(7).key == 5 and tree.successor(9) is None
+    assert tree.rank(7) == 2 and tree.select(3).key == 9
+    assert tree.count_range(4, 9) == 2
+    with pytest.raises(KeyError):
+        tree.update(insert=(100,), delete=(42,))
+    assert 100 not in tree  # nothing was published
+
+def test_bplus_tree(tmp_path):
+    import numpy as np
+    from bplus_tree import BPlusTree
+    rng = np.random.default_rng(11)
+    path = str(tmp_path / 'keys.bpt')
+    for n in [0, 1, 13, 2000]:
+        keys = rng.integers(0, n // 2 + 2, n)
+        index = BPlusTree.build(path, keys, page_size=256, cache_size=8)  # 15 keys per leaf
+        expected = np.sort(keys, kind='stable').tolist()
+        assert len(index) == n
+        assert list(index) == expected
+        # Values default to the positions in the input, and equal keys keep their order
+        assert all(keys[v] == k for k, v in index.items())
+        for q in range(-1, n // 2 + 4):
+            larger = [k for k in expected if k > q]
+            successor = index.successor(q)
+            assert (successor and successor[0]) == (larger[0] if larger else None)
+            value = index.search(q)
+            assert (value is not None) == (q in expected)
+            if value is not None:
+                assert keys[value] == q and value == np.flatnonzero(keys == q)[0]
+            assert [k for k, _ in index.items(q, q + 3)] == [k for k in expected if q <= k < q + 3]
+        if n:
+            assert index.minimum()[0] == expected[0]
+            assert index.maximum()[0] == expected[-1]
+        else:
+            assert index.minimum() is None and index.successor(0) is None
+        assert len(index.cache) <= 8
+        index.close()
+
+def test_bplus_tree_reopen_float_keys(tmp_path):
+    from bplus_tree import BPlusTree
+    path = str(tmp_path / 'floats.bpt')
+    with BPlusTree.build(path, [0.5, 2.5, 1.5], values=[10, 30, 20]) as index:
+        assert index.height == 1
+    with BPlusTree(path) as index:
+        assert list(index.items()) == [(0.5, 10), (1.5, 20), (2.5, 30)]
+        assert index.search(1.5) == 20 and index.search(1.0) is None
+        assert index.count_range(1.0, 3.0) == 2
+
+def preorder_shape(node):
+    if node is None:
+        return None
+    return (node.key, preorder_shape(node.left), preorder_shape(node.right))
+
+def test_tree_serialization_round_trip(tmp_path):
+    from tree_serialization import save_tree, load_tree, tree_to_bytes, tree_from_bytes
+    random.seed(12)
+    keys = [random.randint(0, 50) for _ in range(300)]
+    root = build_tree(keys)
+    path = str(tmp_path / 'tree.bst')
+    save_tree(root, path)
+    loaded = load_tree(path)
+    assert preorder_shape(loaded) == preorder_shape(root)  # same shape, not only same keys
+    check_parents(loaded)
+    check_sizes(loaded)
+    assert loaded.parent is None
+    assert tree_from_bytes(tree_to_bytes(None)) is None
+    floats = tree_from_bytes(tree_to_bytes(build_tree([0.5, -1.25, 3.0])))
+    assert preorder_shape(floats) == (0.5, (-1.25, None, None), (3.0, None, None))
+
+def test_eytzinger_layout_matches_tree(tmp_path):
+    import numpy as np
+    from binary_search_tree import iterative_tree_search, tree_items
+    from tree_serialization import (save_eytzinger, load_eytzinger, eytzinger_search,
+                                    eytzinger_lower_bound, eytzinger_lower_bound_batch)
+    random.seed(13)
+    for n in [0, 1, 2, 7, 8, 100, 1000]:
+        keys = [random.randint(0, 2 * n) for _ in range(n)]
+        root = build_tree(keys)
+        path = str(tmp_path / f'tree{n}.npy')
+        save_eytzinger(root, path)
+        layout = load_eytzinger(path)
+        assert isinstance(layout, np.memmap) or n == 0
+        for i in range(n):  # BST order: left child <= node <= right child
+            if 2 * i + 1 < n:
+                assert layout[2 * i + 1] <= layout[i]
+            if 2 * i + 2 < n:
+                assert layout[2 * i + 2] >= layout[i]
+        queries = list(range(-1, 2 * n + 2))
+        batch = eytzinger_lower_bound_batch(layout, np.array(queries))
+        for q, position in zip(queries, batch.tolist()):
+            larger = list(tree_items(root, lo=q))
+            assert eytzinger_lower_bound(layout, q) == position
+            assert (position == -1) == (not larger)
+            if larger:
+                assert layout[position] == larger[0]
+            found = eytzinger_search(layout, q)
+            assert (found != -1) == (iterative_tree_search(root, q) is not None)
@@ -1,4 +1,5 @@
-from binary_heap import Parent, Left_Child, Right_Child, Max_Heapify, Build_Max_Heap, Heapsort
+from binary_heap import Parent, Left_Child, Right_Child, Max_Heapify, Build_Max_Heap, Heapsort, HeapRecorder
+from binary_heap import Max_Heapify_Iterative, Heapsort_In_Place
 
 def test_parent():
     assert Parent(1) == 0
@@ -81,3 +82,267 @@ def test_heapsort_basic():
     A = [3, 5, 1, 10, 2]
     Heapsort(A)
     assert A == sorted(A)  # Check if sorted
+
+def test_heapsort_larger():
+    import random
+    random.seed(0)
+    A = [random.randint(0, 1000) for _ in range(2000)]
+    expected = sorted(A)
+    Heapsort(A)
+    assert A == expected
+
+class SliceCountingList(list):
+    """List that counts the slices read or written (copies of part of the heap)."""
+    slices = 0
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            SliceCountingList.slices += 1
+        return super().__getitem__(index)
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            SliceCountingList.slices += 1
+        super().__setitem__(index, value)
+
+def test_heapsort_does_not_copy_the_heap():
+    # Copying the shrinking heap at every step made Heapsort O(n^2)
+    import random
+    random.seed(1)
+    values = [random.random() for _ in range(10**4)]
+    A = SliceCountingList(values)
+    SliceCountingList.slices = 0
+    Heapsort(A)
+    assert A == sorted(values)
+    assert SliceCountingList.slices == 0
+
+def test_max_heapify_heap_size():
+    A = [1, 2, 3, 20]
+    Max_Heapify(A, 0, heap_size=3)  # A[3] is not part of the heap
+    assert A == [3, 2, 1, 20]
+
+def test_heap_is_headless():
+    # Importing the heap functions must not pull in the plotting libraries
+    import os, subprocess, sys
+    code = "import sys, binary_heap; print(sorted({'matplotlib', 'networkx'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert output.stdout.strip() == '[]'
+
+def test_observer_records_steps():
+    recorder = HeapRecorder()
+    A = [1, 20, 5, 3, 2]
+    Max_Heapify(A, 0, observer=recorder)
+    assert [e['current_node'] for e in recorder.events] == [0, 1, 3]
+    assert recorder.events[0]['changed_nodes'] == [0, 1]
+    assert recorder.events[0]['array'] == [20, 1, 5, 3, 2]
+    assert recorder.events[-1]['array'] == [20, 3, 5, 1, 2]
+
+def test_heapsort_observer_reports_full_array():
+    recorder = HeapRecorder()
+    A = [3, 5, 1, 10, 2]
+    Heapsort(A, observer=recorder)
+    assert A == [1, 2, 3, 5, 10]
+    assert all(len(e['array']) == 5 for e in recorder.events)
+    assert recorder.events[-1]['array'] == A
+
+def test_max_heapify_iterative():
+    A = [1, 20, 5, 3, 2]
+    Max_Heapify_Iterative(A, 0, len(A))
+    assert A == [20, 3, 5, 1, 2]
+    A = [1, 20, 5, 3, 2]
+    Max_Heapify_Iterative(A, 0, 3)  # only A[:3] is part of the heap
+    assert A == [20, 1, 5, 3, 2]
+
+def test_heapsort_in_place():
+    import random
+    random.seed(1)
+    for n in (0, 1, 2, 3, 10, 1000):
+        A = [random.randint(0, 50) for _ in range(n)]
+        expected = sorted(A)
+        assert Heapsort_In_Place(A) is A
+        assert A == expected
+
+def test_heapsort_in_place_numpy():
+    import numpy as np
+    A = np.random.default_rng(0).random(500)
+    expected = np.sort(A)
+    Heapsort_In_Place(A)
+    assert np.array_equal(A, expected)
+
+def test_priority_queue_min_and_max():
+    import random
+    from priority_queue import IndexedPriorityQueue
+    random.seed(2)
+    priorities = [random.randint(0, 100) for _ in range(200)]
+    for max_heap in (False, True):
+        queue = IndexedPriorityQueue(max_heap=max_heap)
+        for item, p in enumerate(priorities):
+            queue.push(item, p)
+        assert len(queue) == 200
+        assert queue.peek()[1] == (max(priorities) if max_heap else min(priorities))
+        popped = [queue.pop()[1] for _ in range(200)]
+        assert popped == sorted(priorities, reverse=max_heap)
+
+def test_priority_queue_update_and_remove():
+    import random
+    from priority_queue import IndexedPriorityQueue
+    random.seed(3)
+    queue = IndexedPriorityQueue()
+    expected = {}
+    for item in range(300):
+        expected[item] = random.randint(0, 1000)
+        queue.push(item, expected[item])
+    for item in random.sample(range(300), 100):
+        expected[item] = random.randint(0, 1000)
+        queue.update(item, expected[item])
+    for item in random.sample(range(300), 50):
+        assert queue.remove(item) == expected.pop(item)
+        assert item not in queue
+    assert queue.priority(next(iter(expected))) == expected[next(iter(expected))]
+    popped = []
+    while queue:
+        item, p = queue.pop()
+        assert expected[item] == p
+        popped.append(p)
+    assert popped == sorted(expected.values())
+
+def test_priority_queue_errors():
+    import pytest
+    from priority_queue import IndexedPriorityQueue
+    queue = IndexedPriorityQueue()
+    with pytest.raises(IndexError):
+        queue.pop()
+    queue.push('a', 1)
+    with pytest.raises(ValueError):
+        queue.push('a', 2)
+
+def test_dary_heap():
+    import random
+    from dary_heap import DaryHeap, Dary_Parent, Dary_First_Child
+    assert Dary_Parent(Dary_First_Child(3, 4) + 3, 4) == 3
+    random.seed(4)
+    values = [random.random() for _ in range(1000)]
+    for d in (2, 3, 4, 8):
+        heap = DaryHeap(d, capacity=3)
+        for v in values:
+            heap.push(v)
+        assert heap.peek() == min(values)
+        assert [heap.pop() for _ in range(len(values))] == sorted(values)
+        assert len(heap) == 0
+
+def test_dary_heap_from_array_and_max():
+    import random
+    from dary_heap import DaryHeap
+    random.seed(5)
+    values = [random.randint(-100, 100) for _ in range(500)]
+    heap = DaryHeap.from_array(values, d=4, typecode='q')
+    assert [heap.pop() for _ in range(len(values))] == sorted(values)
+    heap = DaryHeap.from_array(values, d=8, typecode='q', max_heap=True)
+    heap.push(1000)
+    assert [heap.pop() for _ in range(len(values) + 1)] == sorted(values + [1000], reverse=True)
+
+def test_dary_heap_growth_and_overflow():
+    import pytest
+    from dary_heap import DaryHeap
+    heap = DaryHeap.from_array([])
+    for v in (3.0, 1.0, 2.0):
+        heap.push(v)
+    assert [heap.pop() for _ in range(3)] == [1.0, 2.0, 3.0]
+    heap = DaryHeap(typecode='q', max_heap=True)
+    heap.push(5)
+    with pytest.raises(OverflowError):
+        heap.push(-2**63)
+    assert len(heap) == 1 and heap.pop() == 5
+
+def test_top_k():
+    import heapq, random
+    from heap_streams import top_k
+    random.seed(6)
+    values = [random.randint(0, 50) for _ in range(5000)]
+    for k in (0, 1, 7, 100, 6000):
+        for chunk_size in (1, 64, 1024):
+            assert top_k(iter(values), k, chunk_size=chunk_size) == heapq.nlargest(k, values)
+            assert top_k(values, k, largest=False, chunk_size=chunk_size) == heapq.nsmallest(k, values)
+
+def test_top_k_key_and_ties():
+    from heap_streams import top_k
+    words = ['bb', 'a', 'ccc', 'dd', 'e', 'fff', 'gg']
+    assert top_k(words, 3, key=len) == ['ccc', 'fff', 'bb']
+    assert top_k(words, 2, key=len, largest=False) == ['a', 'e']
+
+def test_merge_streams():
+    import random
+    from heap_streams import merge_streams
+    random.seed(7)
+    streams = [sorted(random.randint(0, 100) for _ in range(random.randint(0, 200))) for _ in range(10)]
+    expected = sorted(x for s in streams for x in s)
+    for chunk_size in (1, 3, 1024):
+        assert list(merge_streams(*[iter(s) for s in streams], chunk_size=chunk_size)) == expected
+    assert list(merge_streams()) == []
+
+def test_merge_streams_is_lazy_and_stable():
+    import itertools
+    from heap_streams import merge_streams
+    evens = itertools.count(0, 2)  # infinite streams
+    odds = itertools.count(1, 2)
+    assert list(itertools.islice(merge_streams(evens, odds, chunk_size=1), 6)) == [0, 1, 2, 3, 4, 5]
+    first = [(1, 'a'), (2, 'a')]
+    second = [(1, 'b'), (2, 'b')]
+    merged = list(merge_streams(first, second, key=lambda pair: pair[0]))
+    assert merged == [(1, 'a'), (1, 'b'), (2, 'a'), (2, 'b')]
+
+def test_animation_frames_are_incremental():
+    import numpy as np
+    from heap_animation import HeapFrameRenderer, render_frames
+    recorder = HeapRecorder()
+    A = [3, 5, 1, 10, 2, 8, 7]
+    Heapsort(A, observer=recorder)
+    frames = list(render_frames(recorder.events, workers=1, size=(4, 3), dpi=50))
+    assert len(frames) == len(recorder.events)
+    assert frames[0].shape == (150, 200, 3) and frames[0].dtype == np.uint8
+    # Redrawing only what changed gives the same frame as drawing from scratch
+    for k in (5, len(frames) - 1):
+        fresh = HeapFrameRenderer(size=(4, 3), dpi=50).render(recorder.events[k])
+        assert np.array_equal(fresh, frames[k])
+
+def test_export_animation(tmp_path):
+    from heap_animation import export_animation
+    recorder = HeapRecorder()
+    Heapsort([4, 1, 3, 2], observer=recorder)
+    path = export_animation(recorder.events, str(tmp_path / 'heap.gif'), workers=2, size=(3, 2), dpi=40, chunk_size=3)
+    assert (tmp_path / 'heap.gif').stat().st_size > 0
+    assert path.endswith('heap.gif')
+
+def test_export_animation_empty(tmp_path):
+    import pytest
+    from heap_animation import export_animation, gif_palette
+    with pytest.raises(ValueError):
+        export_animation([], str(tmp_path / 'none.gif'))
+    with pytest.raises(ValueError):
+        gif_palette([])
+    recorder = HeapRecorder()
+    recorder([], "Empty heap")
+    recorder([5], "One node", current_node=0)
+    export_animation(recorder.events, str(tmp_path / 'empty.gif'), workers=1, size=(3, 2), dpi=40)
+    assert (tmp_path / 'empty.gif').stat().st_size > 0
+
+def test_build_max_heap_vectorized():
+    import numpy as np
+    from vectorized_heap import Build_Max_Heap_Vectorized
+    rng = np.random.default_rng(8)
+    for n in (0, 1, 2, 3, 4, 7, 8, 100, 1023, 1024, 1025):
+        A = rng.integers(0, 20, size=n)  # many equal keys
+        expected = list(A)
+        Build_Max_Heap(expected)
+        Build_Max_Heap_Vectorized(A)
+        assert is_max_heap(list(A))
+        assert list(A) == expected  # same heap as Build_Max_Heap
+
+def test_build_max_heap_batched():
+    import numpy as np
+    from vectorized_heap import Build_Max_Heap_Batched
+    M = np.random.default_rng(9).random((50, 37))
+    original = M.copy()
+    Build_Max_Heap_Batched(M)
+    for row, before in zip(M, original):
+        assert is_max_heap(list(row))
+        assert sorted(row) == sorted(before)
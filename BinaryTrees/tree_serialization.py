@@ -0,0 +1,217 @@
+"""
+Compact binary serialization of binary search trees.
+
+Two formats, for numeric keys:
+
+1. Pre-order format (save_tree / load_tree): the keys in pre-order in a NumPy buffer,
+   followed by the shape of the tree, 2 bits per node (has a left child, has a right
+   child) packed with np.packbits. A tree of n int64 keys takes 8n + n/4 bytes plus a
+   small header. In pre-order every node comes before its subtrees, so the tree is
+   rebuilt in one pass with a stack of the child slots still to fill: O(n), and
+   without comparing any keys, so the exact shape is restored (not only the keys).
+
+       header: magic b'BST1', key dtype (4 bytes, e.g. b'<i8'), n (int64)
+       keys:   n keys in pre-order
+       shape:  ceil(2n / 8) bytes
+
+2. Eytzinger layout (save_eytzinger / load_eytzinger): the keys of the tree in the
+   implicit layout of a complete BST, as in a binary heap: the children of position k
+   are 2k + 1 and 2k + 2. The array is saved as a .npy file and loaded memory-mapped;
+   eytzinger_search runs directly on it without building any Node, and the top levels
+   that every search goes through stay together at the start of the array.
+"""
+
+import numpy as np
+from binary_search_tree import Node, tree_items
+
+MAGIC = b'BST1'
+HEADER = np.dtype([('magic', 'S4'), ('key_dtype', 'S4'), ('count', '<i8')])
+HAS_LEFT, HAS_RIGHT = 2, 1  # shape bits of a node, left bit first
+
+
+def _key_dtype(keys):
+    keys = np.asarray(keys)
+    if keys.dtype.kind not in 'iuf':
+        raise ValueError("only numeric keys can be serialized")
+    return keys.dtype.newbyteorder('<')
+
+# ------------------ Pre-order format ------------------ #
+
+def tree_to_bytes(root):
+    """Serialize the tree rooted at root (pre-order keys and shape bits) to bytes."""
+    keys, shape = [], []
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        keys.append(node.key)
+        shape.append((HAS_LEFT if node.left is not None else 0) |
+                     (HAS_RIGHT if node.right is not None else 0))
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)  # visited first
+
+    dtype = _key_dtype(keys) if keys else np.dtype('<i8')
+    header = np.zeros(1, dtype=HEADER)
+    header['magic'], header['key_dtype'], header['count'] = MAGIC, dtype.str.encode(), len(keys)
+    bits = np.unpackbits(np.array(shape, dtype=np.uint8)[:, None], axis=1)[:, 6:]  # 2 bits per node
+    return b''.join((header.tobytes(), np.array(keys, dtype=dtype).tobytes(),
+                     np.packbits(bits.ravel()).tobytes()))
+
+
+def tree_from_bytes(buffer, node_class=Node):
+    """Rebuild a tree serialized by tree_to_bytes, in O(n) and without key comparisons.
+
+    buffer can be bytes, a NumPy array or a memory map. Returns the root."""
+    buffer = memoryview(buffer).cast('B')
+    header = np.frombuffer(buffer, dtype=HEADER, count=1)[0]
+    if header['magic'] != MAGIC:
+        raise ValueError("not a serialized tree")
+    n = int(header['count'])
+    dtype = np.dtype(header['key_dtype'].decode())
+    keys = np.frombuffer(buffer, dtype=dtype, count=n, offset=HEADER.itemsize).tolist()
+    bits = np.unpackbits(np.frombuffer(buffer, dtype=np.uint8, offset=HEADER.itemsize + n * dtype.itemsize),
+                         count=2 * n)
+    has_left, has_right = bits[0::2].tolist(), bits[1::2].tolist()
+
+    nodes = [node_class(key) for key in keys]
+    # Slots waiting for the next node in pre-order: (parent, is left child)
+    slots = []
+    for i, node in enumerate(nodes):
+        if slots:
+            parent, left = slots.pop()
+            node.parent = parent
+            if left:
+                parent.left = node
+            else:
+                parent.right = node
+        if has_right[i]:
+            slots.append((node, False))
+        if has_left[i]:
+            slots.append((node, True))  # the left subtree comes next
+
+    # Children come after their parent in pre-order: subtree sizes in reverse order
+    for node in reversed(nodes):
+        node.size = 1 + (node.left.size if node.left is not None else 0) + \
+            (node.right.size if node.right is not None else 0)
+    return nodes[0] if nodes else None
+
+
+def save_tree(root, path):
+    """Write the tree rooted at root to path in the pre-order format."""
+    with open(path, 'wb') as f:
+        f.write(tree_to_bytes(root))
+
+
+def load_tree(path, node_class=Node):
+    """Read a tree written by save_tree and return its root."""
+    return tree_from_bytes(np.fromfile(path, dtype=np.uint8), node_class)
+
+# ------------------ Eytzinger layout ------------------ #
+
+def eytzinger_layout(sorted_keys):
+    """Return the NumPy array of the sorted keys in Eytzinger order, in O(n).
+
+    An inorder walk of the implicit complete tree (children 2k + 1 and 2k + 2)
+    assigns the keys to its positions in increasing order."""
+    sorted_keys = np.asarray(sorted_keys)
+    n = sorted_keys.shape[0]
+    order = np.empty(n, dtype=np.int64)  # order[i]: position of the i-th smallest key
+    i, k, stack = 0, 0, []
+    while stack or k < n:
+        while k < n:
+            stack.append(k)
+            k = 2 * k + 1
+        k = stack.pop()
+        order[i] = k
+        i += 1
+        k = 2 * k + 2
+    layout = np.empty_like(sorted_keys)
+    layout[order] = sorted_keys
+    return layout
+
+
+def tree_to_eytzinger(root):
+    """Return the keys of the tree rooted at root in Eytzinger order."""
+    keys = list(tree_items(root))
+    return eytzinger_layout(np.array(keys, dtype=_key_dtype(keys) if keys else np.int64))
+
+
+def save_eytzinger(root, path):
+    """Write the keys of the tree rooted at root in Eytzinger order to path (.npy)."""
+    np.save(path, tree_to_eytzinger(root))
+
+
+def load_eytzinger(path):
+    """Memory-map an array written by save_eytzinger (read-only, nothing is rebuilt)."""
+    return np.load(path, mmap_mode='r')
+
+
+def eytzinger_lower_bound(layout, key):
+    """Position in layout of the smallest key >= key, or -1 if there is none.
+
+    The search always goes down to a leaf, to the right when the key is smaller,
+    without testing for equality. The answer is the last node where it went left:
+    shifting out the trailing ones of the (1-based) final position and one more bit."""
+    n = layout.shape[0]
+    k = 1  # 1-based position
+    while k <= n:
+        k = 2 * k + int(layout[k - 1] < key)
+    k >>= (~k & (k + 1)).bit_length()
+    return k - 1
+
+
+def eytzinger_search(layout, key):
+    """Position in layout of a key equal to key, or -1."""
+    k = eytzinger_lower_bound(layout, key)
+    if k >= 0 and layout[k] == key:
+        return k
+    return -1
+
+
+def eytzinger_lower_bound_batch(layout, keys):
+    """eytzinger_lower_bound of every key of the array keys at once, level by level."""
+    n = layout.shape[0]
+    keys = np.asarray(keys)
+    k = np.ones(keys.shape, dtype=np.int64)
+    for _ in range(n.bit_length()):
+        inside = k <= n
+        k[inside] = 2 * k[inside] + (layout[k[inside] - 1] < keys[inside])
+    # bit_length of the lowest zero bit, as in eytzinger_lower_bound (frexp gives it exactly)
+    return (k >> np.frexp(~k & (k + 1))[1]) - 1
+
+
+if __name__ == '__main__':
+    import os
+    import random
+    import tempfile
+    import time
+    from binary_search_tree import tree_bulk_load, iterative_tree_search
+
+    n = 10**6
+    random.seed(42)
+    keys = random.sample(range(10 * n), n)
+    root = tree_bulk_load(keys)
+    folder = tempfile.mkdtemp()
+
+    start_time = time.perf_counter()
+    save_tree(root, os.path.join(folder, 'tree.bst'))
+    print(f"--- {time.perf_counter() - start_time} seconds to save {n} keys "
+          f"({os.path.getsize(os.path.join(folder, 'tree.bst'))} bytes) ---")
+    start_time = time.perf_counter()
+    loaded = load_tree(os.path.join(folder, 'tree.bst'))
+    print(f"--- {time.perf_counter() - start_time} seconds to load them ---")
+
+    save_eytzinger(root, os.path.join(folder, 'tree.npy'))
+    start_time = time.perf_counter()
+    layout = load_eytzinger(os.path.join(folder, 'tree.npy'))
+    print(f"--- {time.perf_counter() - start_time} seconds to map the Eytzinger array ---")
+
+    queries = random.sample(keys, 10**5)
+    start_time = time.perf_counter()
+    for key in queries:
+        iterative_tree_search(loaded, key)
+    print(f"--- {time.perf_counter() - start_time} seconds for {len(queries)} searches in the tree ---")
+    start_time = time.perf_counter()
+    eytzinger_lower_bound_batch(layout, np.array(queries))
+    print(f"--- {time.perf_counter() - start_time} seconds for {len(queries)} batched Eytzinger searches ---")
@@ -0,0 +1,81 @@
+"""
+Vectorized Build_Max_Heap for NumPy arrays.
+
+Build_Max_Heap heapifies the nodes one by one in Python. But the subtrees rooted at
+the nodes of one level of the tree are disjoint, so all of them can be sifted down
+at the same time: at each step every active node is compared with its children, the
+larger child is chosen and the swaps are done through fancy indexing. The levels are
+processed from the last internal level up to the root, as in Build_Max_Heap, so the
+NumPy calls are O(log^2 n) instead of O(n) Python-level Max_Heapify calls.
+
+The same tie rules as Max_Heapify are used (the left child wins between equal
+children, and equal keys are not swapped), so the result is the same heap that
+Build_Max_Heap builds.
+"""
+
+import numpy as np
+
+
+def _sift_down_level(M, nodes, n):
+    """Sift down, in every row of the 2-D array M, all the given nodes of one level."""
+    rows = np.repeat(np.arange(M.shape[0]), nodes.shape[0])
+    cols = np.tile(nodes, M.shape[0])
+    while cols.shape[0] > 0:
+        left = 2 * cols + 1
+        inside = left < n
+        rows, cols, left = rows[inside], cols[inside], left[inside]
+        right = left + 1
+        has_right = right < n
+
+        # Larger child (the right one only if strictly larger)
+        left_values = M[rows, left]
+        right_values = M[rows, np.where(has_right, right, left)]
+        pick_right = has_right & (right_values > left_values)
+        largest = np.where(pick_right, right, left)
+        child_values = np.where(pick_right, right_values, left_values)
+
+        # Swap where the child is larger, then follow the moved keys
+        parent_values = M[rows, cols]
+        swap = child_values > parent_values
+        rows, cols, largest = rows[swap], cols[swap], largest[swap]
+        M[rows, cols] = child_values[swap]
+        M[rows, largest] = parent_values[swap]
+        cols = largest
+
+
+def Build_Max_Heap_Batched(M):
+    """Turn every row of the 2-D NumPy array M into a max heap, in place."""
+    n = M.shape[1]
+    last_internal = n // 2 - 1
+    if last_internal < 0:
+        return M
+    level = (last_internal + 1).bit_length() - 1  # depth of the last internal node, exactly
+    for depth in range(level, -1, -1):
+        first = 2 ** depth - 1
+        nodes = np.arange(first, min(2 * first + 1, last_internal + 1))
+        _sift_down_level(M, nodes, n)
+    return M
+
+
+def Build_Max_Heap_Vectorized(A):
+    """Build a max heap from the 1-D NumPy array A, in place, level by level."""
+    Build_Max_Heap_Batched(A.reshape(1, -1))
+    return A
+
+
+if __name__ == "__main__":
+    import time
+    from binary_heap import Build_Max_Heap
+
+    n = 10**6
+    A = np.random.default_rng(42).random(n)
+    B = A.copy()
+
+    start_time = time.perf_counter()
+    Build_Max_Heap_Vectorized(A)
+    print(f"--- {time.perf_counter() - start_time} seconds (vectorized) for {n} numbers ---")
+
+    start_time = time.perf_counter()
+    Build_Max_Heap(B)
+    print(f"--- {time.perf_counter() - start_time} seconds (Build_Max_Heap) for {n} numbers ---")
+    print("Same heap:", bool(np.array_equal(A, B)))
@@ -0,0 +1,315 @@
+"""
+Shared benchmark suite for the sorting algorithms of the course.
+
+Every sort registers itself in SORTS (through register_sort) and is timed against
+several input distributions with time.perf_counter, warmup runs and repeats.
+Results are plain dictionaries, so they can be saved as JSON and compared later
+against a saved baseline to flag performance regressions.
+
+Usage:
+    python benchmark.py --sizes 10 100 1000 --output results.json
+    python benchmark.py --baseline results.json   # flag regressions
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+
+# Sort functions registered for benchmarking: name -> function(array) -> sorted array
+SORTS = {}
+
+# Input distributions: name -> function(n, rng) -> np.ndarray
+INPUTS = {}
+
+
+def register_sort(name, func=None):
+    """Register a sort function under name. Can also be used as a decorator."""
+    if func is None:
+        def decorator(f):
+            SORTS[name] = f
+            return f
+        return decorator
+    SORTS[name] = func
+    return func
+
+
+def register_input(name):
+    """Decorator registering an input distribution generator under name."""
+    def decorator(f):
+        INPUTS[name] = f
+        return f
+    return decorator
+
+
+# ------------------ Input distributions ------------------ #
+
+@register_input('random')
+def random_permutation(n, rng):
+    """Shuffled permutation of 1..n (the distribution of the old test_function)."""
+    a = np.arange(1, n + 1, dtype=int)
+    rng.shuffle(a)
+    return a
+
+@register_input('sorted')
+def sorted_input(n, rng):
+    """Already sorted integers."""
+    return np.arange(1, n + 1, dtype=int)
+
+@register_input('reversed')
+def reversed_input(n, rng):
+    """Integers in descending order."""
+    return np.arange(n, 0, -1, dtype=int)
+
+@register_input('few_unique')
+def few_unique(n, rng, unique=8):
+    """Integers drawn from a handful of distinct values (lots of equal keys)."""
+    return rng.integers(0, unique, size=n)
+
+@register_input('nearly_sorted')
+def nearly_sorted(n, rng, fraction=0.001):
+    """Sorted integers where a small fraction of positions were swapped at random."""
+    a = np.arange(1, n + 1, dtype=int)
+    swaps = max(1, int(n * fraction)) if n > 1 else 0
+    i = rng.integers(0, n, size=swaps)
+    j = rng.integers(0, n, size=swaps)
+    for x, y in zip(i, j):
+        a[x], a[y] = a[y], a[x]
+    return a
+
+@register_input('random_floats')
+def random_floats(n, rng):
+    """Uniform random floats in [0, 1)."""
+    return rng.random(n)
+
+
+# ------------------ Registered sorts ------------------ #
+
+def load_default_sorts():
+    """Register the sorting algorithms implemented in this repository."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    trees = os.path.join(os.path.dirname(here), 'BinaryTrees')
+    for path in (here, trees):
+        if path not in sys.path:
+            sys.path.append(path)
+
+    from insertion_sort import insertion_sort, binary_insertion_sort
+    from merge_sort import merge, merge_sort, merge_sort_in_place, natural_merge_sort, merge_sort_by
+    register_sort('insertion_sort', insertion_sort)
+    register_sort('binary_insertion_sort', binary_insertion_sort)
+    register_sort('merge_sort', merge_sort)
+    register_sort('merge_sort_in_place', merge_sort_in_place)
+    register_sort('merge_sort_in_place_loop',
+                  lambda array: merge_sort_in_place(array, merge_function=merge))
+    register_sort('natural_merge_sort', natural_merge_sort)
+    register_sort('merge_sort_by', merge_sort_by)
+
+    from parallel_merge_sort import parallel_merge_sort
+    register_sort('parallel_merge_sort', parallel_merge_sort)
+
+    try:
+        import binary_heap
+    except ImportError:  # BinaryTrees not available next to Intro
+        return
+
+    # Heapsort is only timed once it is headless: before it took an observer, it
+    # drew every step with visualize_heap and paused one second on each of them
+    if 'observer' in inspect.signature(binary_heap.Heapsort).parameters:
+        def heapsort(array):
+            binary_heap.Heapsort(array)
+            return array
+        register_sort('heapsort', heapsort)
+    if hasattr(binary_heap, 'Heapsort_In_Place'):
+        register_sort('heapsort_in_place', binary_heap.Heapsort_In_Place)
+
+
+# ------------------ Timing ------------------ #
+
+def time_sort(sort_function, array, repeats=5, warmup=1):
+    """Time sort_function on copies of array.
+
+    Returns the list of runtimes (in seconds) of the timed repeats and the
+    output of the last run, so the caller can check it is correctly sorted."""
+    for _ in range(warmup):
+        sort_function(np.copy(array))
+
+    times = []
+    result = None
+    for _ in range(repeats):
+        a = np.copy(array)
+        start_time = time.perf_counter()
+        result = sort_function(a)
+        times.append(time.perf_counter() - start_time)
+    return times, result
+
+
+def run_benchmarks(sorts=None, inputs=None, sizes=(10, 100, 1000),
+                   repeats=5, warmup=1, seed=42, verbose=True):
+    """Benchmark the given sorts (names in SORTS) on the given input distributions.
+
+    Returns a list of dictionaries, one per (sort, input, n)."""
+    if not SORTS:
+        load_default_sorts()
+    sorts = list(SORTS) if sorts is None else sorts
+    inputs = list(INPUTS) if inputs is None else inputs
+
+    results = []
+    for input_name in inputs:
+        for n in sizes:
+            rng = np.random.default_rng(seed)
+            a = INPUTS[input_name](n, rng)
+            expected = np.sort(a, kind='stable')
+            for sort_name in sorts:
+                times, a_sorted = time_sort(SORTS[sort_name], a, repeats, warmup)
+                if not np.array_equal(np.asarray(a_sorted), expected):
+                    raise AssertionError(f'{sort_name} failed to sort {input_name} input of size {n}')
+                result = {
+                    'sort': sort_name,
+                    'input': input_name,
+                    'n': int(n),
+                    'min': min(times),
+                    'median': statistics.median(times),
+                    'times': times,
+                }
+                results.append(result)
+                if verbose:
+                    print(f"{sort_name:>24} | {input_name:>14} | n = {n:>9} --> "
+                          f"{result['median']:.6f} s (min {result['min']:.6f} s)")
+    return results
+
+
+def speedup_curve(sizes=(10**6,), workers=None, serial='merge_sort_in_place',
+                  repeats=3, warmup=0, seed=42, verbose=True):
+    """Time parallel_merge_sort with an increasing number of workers against a serial sort.
+
+    Returns a list of dictionaries, one per (n, workers), with the speedup over serial."""
+    if not SORTS:
+        load_default_sorts()
+    from parallel_merge_sort import parallel_merge_sort
+    if workers is None:
+        cpus = os.cpu_count() or 1
+        workers = [2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus]
+
+    results = []
+    for n in sizes:
+        a = INPUTS['random'](n, np.random.default_rng(seed))
+        serial_times, _ = time_sort(SORTS[serial], a, repeats, warmup)
+        serial_time = statistics.median(serial_times)
+        for w in workers:
+            def sort_function(array):
+                return parallel_merge_sort(array, workers=w, parallel_cutoff=0)
+            times, a_sorted = time_sort(sort_function, a, repeats, warmup)
+            if not np.array_equal(a_sorted, np.sort(a)):
+                raise AssertionError(f'parallel_merge_sort failed with {w} workers for n = {n}')
+            result = {
+                'n': int(n),
+                'workers': w,
+                'serial': serial,
+                'serial_median': serial_time,
+                'median': statistics.median(times),
+                'speedup': serial_time / statistics.median(times),
+            }
+            results.append(result)
+            if verbose:
+                print(f"n = {n:>10} | {w:>3} workers --> {result['median']:.6f} s "
+                      f"(speedup {result['speedup']:.2f}x over {serial})")
+    return results
+
+
+# ------------------ JSON results and regressions ------------------ #
+
+def save_results(results, path):
+    """Write the benchmark results (and some machine information) as JSON."""
+    data = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path):
+    """Read results written by save_results."""
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare_results(results, baseline, tolerance=0.10, metric='median'):
+    """Compare results against a baseline and return the regressions.
+
+    A regression is a (sort, input, n) measured in both runs whose time grew more
+    than tolerance (relative) over the baseline."""
+    reference = {(r['sort'], r['input'], r['n']): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = reference.get((r['sort'], r['input'], r['n']))
+        if old is None or old[metric] <= 0:
+            continue
+        ratio = r[metric] / old[metric]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                'sort': r['sort'],
+                'input': r['input'],
+                'n': r['n'],
+                'baseline': old[metric],
+                'current': r[metric],
+                'ratio': ratio,
+            })
+    return regressions
+
+
+def main(argv=None):
+    load_default_sorts()
+    parser = argparse.ArgumentParser(description='Benchmark the sorting algorithms.')
+    parser.add_argument('--sorts', nargs='+', choices=sorted(SORTS), default=None)
+    parser.add_argument('--inputs', nargs='+', choices=sorted(INPUTS), default=None)
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 10, 100, 1000])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='relative slowdown over the baseline flagged as regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sorts, args.inputs, args.sizes,
+                             args.repeats, args.warmup, args.seed)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['sort']} | {r['input']} | n = {r['n']}: "
+                  f"{r['baseline']:.6f} s -> {r['current']:.6f} s ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+def speedup_main(argv=None):
+    load_default_sorts()
+    parser = argparse.ArgumentParser(description='Speedup curve of parallel_merge_sort.')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10**6])
+    parser.add_argument('--workers', nargs='+', type=int, default=None)
+    parser.add_argument('--serial', choices=sorted(SORTS), default='merge_sort_in_place')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    results = speedup_curve(args.sizes, args.workers, args.serial, args.repeats)
+    if args.output:
+        save_results(results, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+External (out-of-core) merge sort for binary files of keys larger than the RAM.
+
+1. Run formation: the file is opened as an np.memmap and read in chunks that fit in
+the memory budget. Each chunk is sorted with merge_sort_in_place and written to a
+run file in a temporary directory.
+2. K-way merge: every run is read sequentially in large blocks. A min-heap keyed by
+the last key of each run's current block tells which block runs out first: every key
+smaller than or equal to that bound, in any block, can safely be written out. Those
+pieces are merged and written as one large block, the exhausted blocks are refilled
+and the heap is updated, so the heap only works once per block instead of per key.
+
+All the arrays of both phases are allocated once, with sizes chosen so that their
+total, including the temporaries of the merges, stays within memory_limit.
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+import numpy as np
+from merge_sort import MERGE_BLOCK, merge_sort_in_place
+
+# Default memory budget (bytes) for the sort
+MEMORY_LIMIT = 512 * 2**20
+# Bytes of index temporaries per element of a merge step of merge_sort_in_place
+MERGE_TEMPORARIES = 4 * np.dtype(np.intp).itemsize
+
+
+def sort_runs(path, dtype, run_dir, memory_limit=MEMORY_LIMIT):
+    """Sort chunks of the file at path into run files in run_dir; return their paths."""
+    if os.path.getsize(path) == 0:
+        return []  # an empty file cannot be memory-mapped
+    data = np.memmap(path, dtype=dtype, mode='r')
+    size = data.shape[0]
+    # A chunk, the merge buffer of the same size and the temporaries of one merge step
+    # (at most MERGE_BLOCK elements of each run) must fit in the budget
+    chunk = (memory_limit - 2 * MERGE_BLOCK * MERGE_TEMPORARIES) // (2 * data.itemsize)
+    if chunk < MERGE_BLOCK:
+        chunk = memory_limit // (2 * (data.itemsize + MERGE_TEMPORARIES))
+    chunk = min(max(1, chunk), size)
+    a = np.empty(chunk, dtype=dtype)
+    buffer = np.empty(chunk, dtype=dtype)
+
+    runs = []
+    for lo in range(0, size, chunk):
+        m = min(chunk, size - lo)
+        a[:m] = data[lo:lo + m]
+        merge_sort_in_place(a[:m], buffer=buffer[:m])
+        run_path = os.path.join(run_dir, f'run_{len(runs):06d}.bin')
+        a[:m].tofile(run_path)
+        runs.append(run_path)
+    del data
+    return runs
+
+
+def merge_runs(runs, output, dtype, memory_limit=MEMORY_LIMIT):
+    """K-way merge the sorted run files into the file output."""
+    dtype = np.dtype(dtype)
+    k = len(runs)
+    # Budget: one input block per run, the output of a round (at most one block per
+    # run) and the scratch of the stable sort that merges it (half of it)
+    block = max(1, int(memory_limit / (2.5 * k * dtype.itemsize)))
+    blocks = [np.empty(block, dtype=dtype) for _ in runs]
+    merged = np.empty(k * block, dtype=dtype)
+    start, end = [0] * k, [0] * k  # unread part of each block
+    files = [open(run, 'rb') for run in runs]
+    try:
+        def refill(r):
+            start[r], end[r] = 0, files[r].readinto(blocks[r]) // dtype.itemsize
+            if end[r] > 0:
+                heapq.heappush(heap, (blocks[r][end[r] - 1], r))
+
+        heap = []
+        for r in range(k):
+            refill(r)
+
+        with open(output, 'wb') as out:
+            while heap:
+                bound = heap[0][0]
+                # Everything <= bound in the current blocks comes before anything unread
+                total = 0
+                for r, b in enumerate(blocks):
+                    m = np.searchsorted(b[start[r]:end[r]], bound, side='right')
+                    merged[total:total + m] = b[start[r]:start[r] + m]
+                    start[r] += m
+                    total += m
+                # timsort finds the sorted pieces and just merges them
+                merged[:total].sort(kind='stable')
+                merged[:total].tofile(out)
+
+                # The blocks that ended at bound are now empty: refill them
+                while heap and heap[0][0] <= bound:
+                    _, r = heapq.heappop(heap)
+                    refill(r)
+    finally:
+        for f in files:
+            f.close()
+
+
+def external_merge_sort(path, dtype=np.int64, output=None, memory_limit=MEMORY_LIMIT, tmpdir=None):
+    """Sort the binary file of keys at path using at most about memory_limit bytes of RAM.
+
+    The result is written to output (by default it replaces the input file).
+    Run files are kept in a temporary directory created inside tmpdir."""
+    output = path if output is None else output
+    run_dir = tempfile.mkdtemp(prefix='external_sort_', dir=tmpdir)
+    try:
+        runs = sort_runs(path, dtype, run_dir, memory_limit)
+        if not runs:  # empty input
+            open(output, 'wb').close()
+            return output
+        if len(runs) == 1:
+            shutil.move(runs[0], output)
+            return output
+        merged = os.path.join(run_dir, 'merged.bin')
+        merge_runs(runs, merged, dtype, memory_limit)
+        shutil.move(merged, output)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return output
+
+
+if __name__ == '__main__':
+    import time
+
+    n = 10**7
+    path = os.path.join(tempfile.gettempdir(), 'external_sort_keys.bin')
+    np.random.default_rng(42).integers(0, 2**62, size=n, dtype=np.int64).tofile(path)
+
+    start_time = time.perf_counter()
+    external_merge_sort(path, memory_limit=16 * 2**20)
+    print(f"--- {time.perf_counter() - start_time} seconds for {n} int64 keys ---")
+
+    keys = np.memmap(path, dtype=np.int64, mode='r')
+    print("Sorted:", bool(np.all(keys[:-1] <= keys[1:])))
+    del keys
+    os.remove(path)
@@ -1,27 +1,5 @@
-import time
 import numpy as np
 
-def test_function(sort_function):
-    elapsed_time = []
-    for i in range(5):
-        n = 10**i
-        seed = 42
-
-        a = np.arange(1, n+1, dtype=int)
-
-        np.random.seed(seed)
-        np.random.shuffle(a)
-
-        start_time = time.time()
-        a_sorted = sort_function(np.copy(a))
-        runtime = time.time() - start_time
-        print("--- %s seconds for %d numbers ---" % (runtime, n))
-        # print('Array:\n{a}\nSorted array:\n{a_sorted}')
-        elapsed_time.append(runtime)
-
-    for i in range(len(elapsed_time)):
-        print(f'n = {10**i} --> {elapsed_time[i]} seconds')
-
 
 def insertion_sort(array):
     for j in range(1, array.shape[0]):
@@ -36,5 +14,23 @@ def insertion_sort(array):
     return array
 
 
+def binary_insertion_sort(array):
+    """Insertion sort that finds each insertion point by binary search.
+
+    np.searchsorted on the sorted prefix array[:j] gives the position (after the
+    equal keys, so the sort stays stable) and the tail is shifted with a single
+    slice assignment instead of one element at a time."""
+    for j in range(1, array.shape[0]):
+        key = array[j]
+        if not key < array[j - 1]:
+            continue  # already in place
+        i = np.searchsorted(array[:j], key, side='right')
+        array[i + 1:j + 1] = array[i:j]
+        array[i] = key
+
+    return array
+
+
 if __name__ == '__main__':
-    test_function(insertion_sort)
+    from benchmark import main
+    main(['--sorts', 'insertion_sort', 'binary_insertion_sort'])
@@ -1,26 +1,10 @@
-import time
 import numpy as np
+from insertion_sort import insertion_sort
 
-def test_function(sort_function):
-    elapsed_time = []
-    for i in range(5):
-        n = 10**i
-        seed = 42
-
-        a = np.arange(1, n+1, dtype=int)
-
-        np.random.seed(seed)
-        np.random.shuffle(a)
-
-        start_time = time.time()
-        a_sorted = sort_function(np.copy(a))
-        runtime = time.time() - start_time
-        print("--- %s seconds for %d numbers ---" % (runtime, n))
-        # print('Array:\n{a}\nSorted array:\n{a_sorted}')
-        elapsed_time.append(runtime)
-
-    for i in range(len(elapsed_time)):
-        print(f'n = {10**i} --> {elapsed_time[i]} seconds')
+# Runs shorter than this are sorted with insertion sort by merge_sort_in_place
+INSERTION_CUTOFF = 32
+# Elements taken from each run per NumPy merge step, which bounds the index temporaries
+MERGE_BLOCK = 4096
 
 
 def merge_sort(array):
@@ -58,5 +42,295 @@ def merge_sort(array):
     return a_merged
 
 
+def merge(src, lo, mid, hi, dst):
+    """Merge the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi].
+
+    Elements are moved one at a time; on equal keys the left run goes first (stable)."""
+    j1, j2 = lo, mid
+    for j in range(lo, hi):
+        if j2 >= hi:
+            dst[j] = src[j1]
+            j1 += 1
+        elif j1 >= mid:
+            dst[j] = src[j2]
+            j2 += 1
+        elif src[j2] < src[j1]:
+            dst[j] = src[j2]
+            j2 += 1
+        else:
+            dst[j] = src[j1]
+            j1 += 1
+
+
+def merge_positions(left, right):
+    """Positions of the elements of the sorted arrays left and right in their stable merge.
+
+    The final position of each element is its index in its own array plus the number
+    of elements of the other array that go before it, found with np.searchsorted.
+    Left elements are placed after the right ones strictly smaller than them and
+    right elements after the left ones smaller or equal, so the merge is stable."""
+    left_positions = np.arange(left.shape[0]) + np.searchsorted(right, left, side='left')
+    right_positions = np.arange(right.shape[0]) + np.searchsorted(left, right, side='right')
+    return left_positions, right_positions
+
+
+def merge_arrays(left, right, out):
+    """Merge the sorted arrays left and right into out with NumPy.
+
+    Both arrays are scattered into out in one shot (see merge_positions)."""
+    if left.shape[0] == 0 or right.shape[0] == 0 or not right[0] < left[-1]:
+        out[:left.shape[0]] = left  # already in order
+        out[left.shape[0]:] = right
+        return
+
+    left_positions, right_positions = merge_positions(left, right)
+    out[left_positions] = left
+    out[right_positions] = right
+
+
+def merge_arrays_blocked(left, right, out, block=MERGE_BLOCK):
+    """merge_arrays in steps of at most block elements from each array.
+
+    Each step takes the next block of left and the elements of right that go before
+    its last element (at most block of them, cutting the left block if needed), so it
+    is a prefix of the rest of the merge. The index arrays of merge_positions are then
+    O(block) instead of O(n) int64 temporaries."""
+    i, j = 0, 0
+    n_left, n_right = left.shape[0], right.shape[0]
+    while i < n_left and j < n_right:
+        i_end = min(i + block, n_left)
+        # Right elements strictly smaller than the last left one go before it (searched
+        # as a one-element slice: a tuple key of an object array is not a sequence)
+        j_end = j + int(right[j:j + block].searchsorted(left[i_end - 1:i_end], side='left')[0])
+        if j_end == j + block and j_end < n_right:
+            # Too many right elements: keep only the left ones <= the last right one
+            i_end = i + int(left[i:i_end].searchsorted(right[j_end - 1:j_end], side='right')[0])
+        merge_arrays(left[i:i_end], right[j:j_end], out[i + j:i_end + j_end])
+        i, j = i_end, j_end
+    out[i + j:i + n_right] = right[j:]  # one of the two remainders is empty
+    out[i + j:n_left + j] = left[i:]
+
+
+def merge_vectorized(src, lo, mid, hi, dst):
+    """Merge the sorted runs src[lo:mid] and src[mid:hi] into dst[lo:hi] with NumPy
+    (see merge_arrays_blocked)."""
+    merge_arrays_blocked(src[lo:mid], src[mid:hi], dst[lo:hi])
+
+
+def merge_sort_in_place(array, cutoff=INSERTION_CUTOFF, buffer=None, merge_function=merge_vectorized):
+    """Bottom-up merge sort that sorts array in place.
+
+    Runs of `cutoff` elements are first sorted with insertion sort, then they are
+    merged pairwise level by level. Every level merges from one array to the other
+    (ping-pong between array and a single auxiliary buffer of n elements, which can
+    be passed in to be reused).
+
+    merge_function is the merge kernel: merge_vectorized (default), whose NumPy
+    temporaries are bounded by MERGE_BLOCK elements per merge step, so the extra
+    memory is the buffer plus O(MERGE_BLOCK); or the per-element reference loop merge,
+    which allocates nothing besides the buffer."""
+    size = array.shape[0]
+    if size <= 1:
+        return array
+    cutoff = max(1, cutoff)
+
+    # Sort the small runs
+    for lo in range(0, size, cutoff):
+        insertion_sort(array[lo:lo + cutoff])
+    if size <= cutoff:
+        return array
+
+    if buffer is None:
+        buffer = np.empty_like(array)
+    elif buffer.shape[0] < size:
+        raise ValueError("buffer must have at least as many elements as array")
+
+    src, dst = array, buffer
+    width = cutoff
+    while width < size:
+        for lo in range(0, size, 2 * width):
+            mid = min(lo + width, size)
+            hi = min(lo + 2 * width, size)
+            if mid >= hi:  # no right run, just carry the left one over
+                dst[lo:hi] = src[lo:hi]
+            else:
+                merge_function(src, lo, mid, hi, dst)
+        src, dst = dst, src
+        width *= 2
+
+    # The last level wrote into the buffer: copy the result back
+    if src is not array:
+        array[:] = src[:size]
+    return array
+
+
+def count_run(array, lo, ascending_breaks, descending_breaks):
+    """Return the end of the natural run starting at lo, reversing it if it is strictly descending.
+
+    ascending_breaks and descending_breaks hold the positions i where
+    array[i + 1] < array[i] and array[i + 1] >= array[i], so the run end is found
+    by binary search instead of a Python scan."""
+    size = array.shape[0]
+    if lo + 1 >= size:
+        return size
+    if array[lo + 1] < array[lo]:  # strictly descending: reverse it (stays stable)
+        k = descending_breaks.searchsorted(lo)
+        end = descending_breaks[k] + 1 if k < descending_breaks.shape[0] else size
+        array[lo:end] = array[lo:end][::-1].copy()
+    else:
+        k = ascending_breaks.searchsorted(lo)
+        end = ascending_breaks[k] + 1 if k < ascending_breaks.shape[0] else size
+    return end
+
+
+def natural_merge_sort(array, min_run=INSERTION_CUTOFF, buffer=None, merge_function=merge_vectorized):
+    """Adaptive merge sort (Timsort-like) that sorts array in place.
+
+    The array is split into its natural runs: ascending runs are kept as they are and
+    strictly descending runs are reversed. Runs shorter than min_run are extended with
+    insertion sort. The runs are pushed on a stack and merged following Timsort's
+    invariants (each run longer than the sum of the next two above it), which keeps
+    the merges balanced. An already sorted array is a single run, sorted in O(n)."""
+    size = array.shape[0]
+    if size <= 1:
+        return array
+    if buffer is None:
+        buffer = np.empty_like(array)
+
+    ascending_breaks = np.flatnonzero(array[1:] < array[:-1])
+    descending_breaks = np.flatnonzero(array[1:] >= array[:-1])
+
+    def merge_at(i):
+        """Merge the runs i and i + 1 of the stack."""
+        lo, mid = runs[i]
+        _, hi = runs[i + 1]
+        runs[i] = (lo, hi)
+        del runs[i + 1]
+        # Skip the elements that are already in their final place
+        # One-element slices, as in merge_arrays_blocked
+        start = lo + int(array[lo:mid].searchsorted(array[mid:mid + 1], side='right')[0])
+        stop = mid + int(array[mid:hi].searchsorted(array[mid - 1:mid], side='left')[0])
+        if start >= mid or stop <= mid:
+            return
+        merge_function(array, start, mid, stop, buffer)
+        array[start:stop] = buffer[start:stop]
+
+    runs = []  # stack of (lo, hi) of the pending runs
+    lo = 0
+    while lo < size:
+        end = count_run(array, lo, ascending_breaks, descending_breaks)
+        if end - lo < min_run:
+            end = min(lo + min_run, size)
+            insertion_sort(array[lo:end])
+        runs.append((lo, end))
+        lo = end
+
+        # Restore the invariants of the stack (lengths of the top runs: A, B, C, D)
+        while len(runs) > 1:
+            n = len(runs) - 2
+            lengths = [hi - lo for lo, hi in runs[-4:]]
+            d, c = lengths[-1], lengths[-2]
+            b = lengths[-3] if n > 0 else None
+            a = lengths[-4] if n > 1 else None
+            if (b is not None and b <= c + d) or (a is not None and a <= b + c):
+                if b < d:
+                    n -= 1
+                merge_at(n)
+            elif c <= d:
+                merge_at(n)
+            else:
+                break
+
+    # Merge what is left on the stack
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if n > 0 and runs[n - 1][1] - runs[n - 1][0] < runs[n + 1][1] - runs[n + 1][0]:
+            n -= 1
+        merge_at(n)
+
+    return array
+
+
+def argsort_keys(keys, cutoff=INSERTION_CUTOFF):
+    """Return the permutation that stably sorts the 1-D array keys.
+
+    Bottom-up merge sort of the keys that carries the original index of each key
+    along: runs of `cutoff` are sorted with insertion sort, then every merge scatters
+    the keys and their indices to the same positions (merge_positions)."""
+    size = keys.shape[0]
+    keys = np.array(keys)  # sorted alongside the permutation, the input is untouched
+    perm = np.arange(size)
+    cutoff = max(1, cutoff)
+
+    # Insertion sort of the small runs, moving each index with its key
+    for lo in range(0, size, cutoff):
+        hi = min(lo + cutoff, size)
+        for j in range(lo + 1, hi):
+            key, index = keys[j], perm[j]
+            i = j - 1
+            while i >= lo and keys[i] > key:
+                keys[i + 1] = keys[i]
+                perm[i + 1] = perm[i]
+                i = i - 1
+            keys[i + 1] = key
+            perm[i + 1] = index
+
+    keys_buffer = np.empty_like(keys)
+    perm_buffer = np.empty_like(perm)
+    width = cutoff
+    while width < size:
+        for lo in range(0, size, 2 * width):
+            mid = min(lo + width, size)
+            hi = min(lo + 2 * width, size)
+            if mid >= hi or not keys[mid] < keys[mid - 1]:  # already in order
+                keys_buffer[lo:hi] = keys[lo:hi]
+                perm_buffer[lo:hi] = perm[lo:hi]
+                continue
+            left_positions, right_positions = merge_positions(keys[lo:mid], keys[mid:hi])
+            keys_buffer[lo + left_positions] = keys[lo:mid]
+            keys_buffer[lo + right_positions] = keys[mid:hi]
+            perm_buffer[lo + left_positions] = perm[lo:mid]
+            perm_buffer[lo + right_positions] = perm[mid:hi]
+        keys, keys_buffer = keys_buffer, keys
+        perm, perm_buffer = perm_buffer, perm
+        width *= 2
+
+    return perm
+
+
+def merge_argsort(array, order=None, key=None, cutoff=INSERTION_CUTOFF):
+    """Return the permutation that stably sorts array (like np.argsort(kind='stable')).
+
+    The sort keys are, in this order of priority:
+    - key(array), if a key function is given. It is called once on the whole array
+      and returns a key array, or a list of key arrays (most significant first);
+    - the fields named in order (a name or a list of names) of a structured array;
+    - all the fields of a structured array, or the values of a plain array.
+    Several keys are sorted lexicographically with one stable pass per key, from the
+    least to the most significant. Each key array is computed once, so the records
+    themselves never move: reorder them with a single gather, array[perm]."""
+    if key is not None:
+        keys = key(array)
+    elif order is not None:
+        keys = [array[name] for name in ([order] if isinstance(order, str) else order)]
+    elif array.dtype.names is not None:
+        keys = [array[name] for name in array.dtype.names]
+    else:
+        keys = array
+    if isinstance(keys, np.ndarray):
+        keys = [keys]
+
+    perm = np.arange(array.shape[0])
+    for column in reversed(keys):
+        perm = perm[argsort_keys(np.asarray(column)[perm], cutoff)]
+    return perm
+
+
+def merge_sort_by(array, order=None, key=None):
+    """Return a stably sorted copy of array (see merge_argsort), gathered in one step."""
+    return array[merge_argsort(array, order, key)]
+
+
 if __name__ == '__main__':
-    test_function(merge_sort)
+    from benchmark import main
+    main(['--sorts', 'merge_sort', 'merge_sort_in_place', 'merge_sort_in_place_loop', 'natural_merge_sort'])
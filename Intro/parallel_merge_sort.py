@@ -0,0 +1,123 @@
+"""
+Parallel merge sort over shared memory.
+
+The array is copied into a multiprocessing.shared_memory block (plus a second block
+used as merge buffer) that every worker of the process pool attaches to once, so no
+array data is ever pickled: tasks only carry index ranges.
+
+1. The array is split into one chunk per worker and each chunk is sorted with the
+serial merge_sort_in_place.
+2. The sorted runs are merged pairwise, level by level, ping-ponging between the two
+blocks. To keep every worker busy when there are fewer pairs than workers (the top
+levels of the tree), each merge is split into independent pieces of equal output
+size using merge-path partitions: the co-rank of an output position k is the number
+of elements of the left run among the first k merged elements, found by binary search.
+"""
+
+import os
+from multiprocessing import Pool, shared_memory
+import numpy as np
+from merge_sort import INSERTION_CUTOFF, merge_arrays, merge_sort_in_place
+
+# Arrays shorter than this are sorted serially: the pool start up costs more
+PARALLEL_CUTOFF = 1 << 16
+
+# Shared blocks attached by each worker (set by _attach)
+_blocks = []
+_arrays = []
+
+
+def _attach(names, shape, dtype):
+    """Pool initializer: attach the worker to the shared data and buffer blocks."""
+    for name in names:
+        shm = shared_memory.SharedMemory(name=name)
+        _blocks.append(shm)
+        _arrays.append(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _sort_chunk(lo, hi, cutoff):
+    """Sort the chunk [lo, hi) of the shared data block."""
+    data, buffer = _arrays
+    merge_sort_in_place(data[lo:hi], cutoff=cutoff, buffer=buffer[lo:hi])
+
+
+def co_rank(k, left, right):
+    """Number of elements of left among the first k elements of the stable merge
+    of the sorted arrays left and right."""
+    lo = max(0, k - right.shape[0])
+    hi = min(k, left.shape[0])
+    while lo < hi:
+        i = (lo + hi) // 2
+        if left[i] <= right[k - i - 1]:  # left[i] is merged before right[k - i - 1]
+            lo = i + 1
+        else:
+            hi = i
+    return lo
+
+
+def _merge_piece(src, lo, mid, hi, k0, k1):
+    """Write the outputs [k0, k1) of the merge of runs [lo, mid) and [mid, hi)
+    of shared block src into the other block."""
+    source, destination = _arrays[src], _arrays[1 - src]
+    left, right = source[lo:mid], source[mid:hi]
+    i0, i1 = co_rank(k0, left, right), co_rank(k1, left, right)
+    merge_arrays(left[i0:i1], right[k0 - i0:k1 - i1], destination[lo + k0:lo + k1])
+
+
+def parallel_merge_sort(array, workers=None, cutoff=INSERTION_CUTOFF, parallel_cutoff=PARALLEL_CUTOFF):
+    """Sort array in place using a pool of `workers` processes (default: all CPUs).
+
+    The array is copied into shared memory, so it must hold plain values: object
+    arrays (pointers to Python objects) raise TypeError."""
+    if array.dtype.hasobject:
+        raise TypeError("parallel_merge_sort cannot share object arrays between processes")
+    size = array.shape[0]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or size < parallel_cutoff:
+        return merge_sort_in_place(array, cutoff=cutoff)
+
+    blocks = [shared_memory.SharedMemory(create=True, size=max(1, array.nbytes)) for _ in range(2)]
+    try:
+        data = np.ndarray(array.shape, dtype=array.dtype, buffer=blocks[0].buf)
+        data[:] = array
+
+        with Pool(workers, initializer=_attach,
+                  initargs=([b.name for b in blocks], array.shape, array.dtype)) as pool:
+            # Sort one chunk per worker
+            bounds = [size * i // workers for i in range(workers + 1)]
+            runs = list(zip(bounds[:-1], bounds[1:]))
+            pool.starmap(_sort_chunk, [(lo, hi, cutoff) for lo, hi in runs])
+
+            # Merge the runs pairwise, splitting each merge in merge-path pieces
+            src = 0
+            while len(runs) > 1:
+                pairs = len(runs) // 2
+                pieces = -(-workers // pairs)  # ceil
+                tasks = []
+                merged = []
+                for p in range(pairs):
+                    (lo, mid), (_, hi) = runs[2 * p], runs[2 * p + 1]
+                    length = hi - lo
+                    for i in range(pieces):
+                        tasks.append((src, lo, mid, hi, length * i // pieces, length * (i + 1) // pieces))
+                    merged.append((lo, hi))
+                if len(runs) % 2:  # odd run out: merge it with nothing
+                    lo, hi = runs[-1]
+                    tasks.append((src, lo, hi, hi, 0, hi - lo))
+                    merged.append((lo, hi))
+                pool.starmap(_merge_piece, tasks)
+                runs = merged
+                src = 1 - src
+
+        array[:] = np.ndarray(array.shape, dtype=array.dtype, buffer=blocks[src].buf)
+        del data
+    finally:
+        for b in blocks:
+            b.close()
+            b.unlink()
+    return array
+
+
+if __name__ == '__main__':
+    from benchmark import speedup_main
+    speedup_main()
@@ -0,0 +1,229 @@
+import numpy as np
+from insertion_sort import insertion_sort, binary_insertion_sort
+from merge_sort import (merge, merge_vectorized, merge_arrays_blocked, merge_sort, merge_sort_in_place, natural_merge_sort,
+                        argsort_keys, merge_argsort, merge_sort_by)
+from external_merge_sort import external_merge_sort, sort_runs, merge_runs
+from parallel_merge_sort import co_rank, parallel_merge_sort
+from benchmark import INPUTS, compare_results
+
+def random_array(n, seed=42):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, n, size=n)
+
+def test_insertion_sort():
+    a = random_array(200)
+    assert np.array_equal(insertion_sort(np.copy(a)), np.sort(a))
+
+def test_binary_insertion_sort():
+    for n in (0, 1, 2, 50, 500):
+        a = random_array(n)
+        assert np.array_equal(binary_insertion_sort(np.copy(a)), np.sort(a))
+    floats = np.random.default_rng(3).random(100)
+    assert np.array_equal(binary_insertion_sort(np.copy(floats)), np.sort(floats))
+
+def test_merge_sort():
+    a = random_array(1000)
+    assert np.array_equal(merge_sort(np.copy(a)), np.sort(a))
+
+def test_merge_sort_small():
+    assert merge_sort(np.array([], dtype=int)).shape[0] == 0
+    assert np.array_equal(merge_sort(np.array([7])), [7])
+
+def test_benchmark_inputs():
+    rng = np.random.default_rng(0)
+    for name, generator in INPUTS.items():
+        a = generator(100, rng)
+        assert a.shape == (100,), name
+    assert np.array_equal(INPUTS['sorted'](5, rng), [1, 2, 3, 4, 5])
+    assert np.array_equal(INPUTS['reversed'](5, rng), [5, 4, 3, 2, 1])
+
+def test_compare_results():
+    baseline = [{'sort': 's', 'input': 'random', 'n': 10, 'median': 1.0}]
+    faster = [{'sort': 's', 'input': 'random', 'n': 10, 'median': 0.9}]
+    slower = [{'sort': 's', 'input': 'random', 'n': 10, 'median': 1.5}]
+    assert compare_results(faster, baseline) == []
+    regressions = compare_results(slower, baseline, tolerance=0.1)
+    assert len(regressions) == 1
+    assert regressions[0]['ratio'] == 1.5
+
+def test_merge_sort_in_place():
+    for n in (0, 1, 5, 33, 100, 1000):
+        a = random_array(n)
+        b = np.copy(a)
+        assert merge_sort_in_place(b) is b
+        assert np.array_equal(b, np.sort(a))
+
+def test_merge_sort_in_place_cutoff_and_buffer():
+    a = random_array(257)
+    buffer = np.empty(300, dtype=a.dtype)
+    for cutoff in (1, 2, 7, 64):
+        b = np.copy(a)
+        merge_sort_in_place(b, cutoff=cutoff, buffer=buffer)
+        assert np.array_equal(b, np.sort(a))
+
+def test_merge_kernels_agree():
+    rng = np.random.default_rng(1)
+    for size_left, size_right in ((0, 5), (5, 0), (1, 1), (10, 7), (50, 64)):
+        src = np.concatenate((np.sort(rng.integers(0, 10, size_left)),
+                              np.sort(rng.integers(0, 10, size_right))))
+        expected = np.empty_like(src)
+        merge(src, 0, size_left, src.shape[0], expected)
+        dst = np.empty_like(src)
+        merge_vectorized(src, 0, size_left, src.shape[0], dst)
+        assert np.array_equal(dst, expected)
+        assert np.array_equal(dst, np.sort(src))
+
+class Item:
+    """Compares by key only, so the tag shows the order of equal keys."""
+    def __init__(self, key, tag):
+        self.key, self.tag = key, tag
+    def __lt__(self, other):
+        return self.key < other.key
+    def __le__(self, other):
+        return self.key <= other.key
+    def __gt__(self, other):
+        return self.key > other.key
+    def __ge__(self, other):
+        return self.key >= other.key
+
+def test_merge_kernels_are_stable():
+    left = [Item(k, 'left') for k in (0, 1, 1, 2)]
+    right = [Item(k, 'right') for k in (1, 2, 2, 3)]
+    src = np.array(left + right, dtype=object)
+    for merge_function in (merge, merge_vectorized):
+        dst = np.empty_like(src)
+        merge_function(src, 0, 4, 8, dst)
+        assert [(x.key, x.tag) for x in dst] == [
+            (0, 'left'), (1, 'left'), (1, 'left'), (1, 'right'),
+            (2, 'left'), (2, 'right'), (2, 'right'), (3, 'right')]
+
+def test_merge_arrays_blocked():
+    rng = np.random.default_rng(2)
+    for size_left, size_right, block in ((0, 5, 2), (5, 0, 2), (100, 7, 3), (7, 100, 3), (300, 300, 1)):
+        for high in (3, 1000):
+            left = np.sort(rng.integers(0, high, size_left))
+            right = np.sort(rng.integers(0, high, size_right))
+            # Tag equal keys with their origin: left ones must come first
+            tagged_left = left * 2 * size_left * size_right + np.arange(size_left)
+            tagged_right = right * 2 * size_left * size_right + size_left + np.arange(size_right)
+            out = np.empty(size_left + size_right, dtype=left.dtype)
+            merge_arrays_blocked(tagged_left, tagged_right, out, block)
+            assert np.array_equal(out, np.sort(np.concatenate((tagged_left, tagged_right))))
+
+def test_merge_sort_in_place_memory():
+    import tracemalloc
+    a = random_array(10**5)
+    buffer = np.empty_like(a)
+    tracemalloc.start()
+    merge_sort_in_place(a, buffer=buffer)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < a.nbytes / 2  # only block-sized temporaries besides the buffer
+    assert np.all(a[1:] >= a[:-1])
+
+def test_merge_sort_in_place_loop_kernel():
+    a = random_array(300)
+    b = merge_sort_in_place(np.copy(a), cutoff=4, merge_function=merge)
+    assert np.array_equal(b, np.sort(a))
+
+def test_co_rank():
+    left = np.array([1, 2, 2, 5])
+    right = np.array([2, 3, 4])
+    merged = np.sort(np.concatenate((left, right)), kind='stable')
+    for k in range(merged.shape[0] + 1):
+        i = co_rank(k, left, right)
+        assert np.array_equal(np.sort(np.concatenate((left[:i], right[:k - i]))), merged[:k])
+    assert co_rank(3, left, right) == 3  # equal keys: left run first
+
+def test_parallel_merge_sort():
+    for workers in (2, 3):
+        a = random_array(5000)
+        b = parallel_merge_sort(np.copy(a), workers=workers, parallel_cutoff=0)
+        assert np.array_equal(b, np.sort(a))
+
+def test_parallel_merge_sort_rejects_objects():
+    import pytest
+    with pytest.raises(TypeError):
+        parallel_merge_sort(np.array([3, 1, 2], dtype=object), workers=2, parallel_cutoff=1)
+
+def test_external_merge_sort(tmp_path):
+    a = np.random.default_rng(5).integers(-1000, 1000, size=10000, dtype=np.int64)
+    path = str(tmp_path / 'keys.bin')
+    a.tofile(path)
+    # Tiny budget: many runs and small merge blocks
+    external_merge_sort(path, memory_limit=8 * 1024, tmpdir=str(tmp_path))
+    assert np.array_equal(np.fromfile(path, dtype=np.int64), np.sort(a))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['keys.bin']
+
+def test_external_merge_sort_memory_limit(tmp_path):
+    import tracemalloc
+    path = str(tmp_path / 'keys.bin')
+    a = np.random.default_rng(5).integers(0, 2**62, size=10**5)
+    a.tofile(path)
+    limit = 2**19
+    tracemalloc.start()
+    runs = sort_runs(path, np.int64, str(tmp_path), limit)
+    run_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    merge_runs(runs, str(tmp_path / 'out.bin'), np.int64, limit)
+    merge_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(runs) > 1
+    assert run_peak <= limit and merge_peak <= limit
+    assert np.array_equal(np.fromfile(str(tmp_path / 'out.bin'), dtype=np.int64), np.sort(a))
+
+def test_external_merge_sort_output_and_empty(tmp_path):
+    a = np.arange(100, 0, -1, dtype=np.int64)
+    a.tofile(str(tmp_path / 'in.bin'))
+    external_merge_sort(str(tmp_path / 'in.bin'), output=str(tmp_path / 'out.bin'))
+    assert np.array_equal(np.fromfile(str(tmp_path / 'out.bin'), dtype=np.int64), np.sort(a))
+    assert np.array_equal(np.fromfile(str(tmp_path / 'in.bin'), dtype=np.int64), a)
+
+    (tmp_path / 'empty.bin').write_bytes(b'')
+    external_merge_sort(str(tmp_path / 'empty.bin'))
+    assert (tmp_path / 'empty.bin').read_bytes() == b''
+
+def test_natural_merge_sort():
+    rng = np.random.default_rng(7)
+    for name, generator in INPUTS.items():
+        for n in (0, 1, 2, 31, 32, 33, 1000, 5000):
+            a = generator(n, rng)
+            assert np.array_equal(natural_merge_sort(np.copy(a)), np.sort(a)), (name, n)
+    # Mixed ascending and descending runs of many lengths
+    a = np.concatenate([np.sort(rng.integers(0, 100, k))[::(-1) ** k] for k in range(1, 80)])
+    for min_run in (1, 4, 32):
+        assert np.array_equal(natural_merge_sort(np.copy(a), min_run=min_run), np.sort(a))
+
+def test_natural_merge_sort_is_stable():
+    keys = [3, 2, 2, 1, 5, 5, 0, 3, 3, 4, 1, 1, 2, 9, 8, 8, 7]
+    items = np.array([Item(k, i) for i, k in enumerate(keys)], dtype=object)
+    result = natural_merge_sort(items, min_run=2)
+    assert [(x.key, x.tag) for x in result] == sorted((k, i) for i, k in enumerate(keys))
+
+def test_argsort_keys():
+    rng = np.random.default_rng(11)
+    for n in (0, 1, 7, 100, 1000):
+        a = rng.integers(0, 20, size=n)
+        for cutoff in (1, 32):
+            assert np.array_equal(argsort_keys(a, cutoff), np.argsort(a, kind='stable'))
+
+def test_merge_argsort_fields():
+    rng = np.random.default_rng(12)
+    records = np.zeros(500, dtype=[('a', int), ('b', float), ('payload', 'U8')])
+    records['a'] = rng.integers(0, 5, 500)
+    records['b'] = rng.integers(0, 5, 500) / 2
+    records['payload'] = [str(i) for i in range(500)]
+    perm = merge_argsort(records, order=['a', 'b'])
+    assert np.array_equal(perm, np.lexsort((records['b'], records['a'])))
+    assert np.array_equal(merge_argsort(records, order='b'), np.argsort(records['b'], kind='stable'))
+    assert np.array_equal(merge_sort_by(records, order=['a', 'b']), records[perm])
+
+def test_merge_argsort_key_function():
+    a = np.array([3, -1, -3, 2, 1, -2, 0])
+    calls = []
+    def key(array):
+        calls.append(1)
+        return np.abs(array)
+    perm = merge_argsort(a, key=key)
+    assert list(a[perm]) == [0, -1, 1, 2, -2, 3, -3]
+    assert len(calls) == 1
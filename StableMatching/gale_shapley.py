@@ -51,9 +51,9 @@ def gale_shapley(men_prefs, women_prefs):
         # Check if w is engaged
         engaged = current[w]
         if engaged is not None:  # if engaged
-            # change engagement if the rank of the man that is
-            # engaged to w is smaller than the free man proposing
-            if ranking[w][engaged] < ranking[w][m]:
+            # change engagement if the free man proposing has a smaller
+            # rank (is preferred by w) than the man that is engaged to w
+            if ranking[w][m] < ranking[w][engaged]:
                 current[w] = m
                 free_men.append(engaged)  # engaged man is now free again
             else:
@@ -0,0 +1,46 @@
+import random
+import numpy as np
+from gale_shapley import gale_shapley, create_rankings
+from vectorized_gale_shapley import gale_shapley_array, create_rankings_array
+
+def random_prefs(n, seed):
+    rng = random.Random(seed)
+    return [rng.sample(range(n), n) for _ in range(n)]
+
+def blocking_pairs(men_prefs, women_prefs, current):
+    n = len(current)
+    rank_men, rank_women = create_rankings(men_prefs), create_rankings(women_prefs)
+    wife = [0] * n
+    for w, m in enumerate(current):
+        wife[m] = w
+    return [(m, w) for m in range(n) for w in range(n)
+            if rank_men[m][w] < rank_men[m][wife[m]] and rank_women[w][m] < rank_women[w][current[w]]]
+
+def test_gale_shapley_is_stable():
+    men_prefs, women_prefs = random_prefs(40, 1), random_prefs(40, 2)
+    current = gale_shapley(men_prefs, women_prefs)
+    assert sorted(current) == list(range(40))
+    assert blocking_pairs(men_prefs, women_prefs, current) == []
+
+def test_create_rankings_array():
+    prefs = random_prefs(30, 3)
+    ranking = create_rankings_array(prefs)
+    assert ranking.dtype == np.int32
+    assert ranking.tolist() == create_rankings(prefs)
+
+def test_gale_shapley_array_same_matching():
+    for n, seed in [(1, 0), (2, 1), (10, 2), (200, 3)]:
+        men_prefs, women_prefs = random_prefs(n, seed), random_prefs(n, seed + 100)
+        current = gale_shapley_array(np.array(men_prefs, dtype=np.int32), np.array(women_prefs, dtype=np.int32))
+        assert current.dtype == np.int32
+        assert current.tolist() == gale_shapley(men_prefs, women_prefs)
+    ranking = create_rankings_array(women_prefs)
+    assert gale_shapley_array(men_prefs, ranking=ranking).tolist() == current.tolist()
+
+def test_gale_shapley_array_identical_preferences():
+    # Same lists for everyone: the women accept the men in order, so man m gets woman m
+    n = 50
+    men_prefs = [list(range(n))] * n
+    women_prefs = [list(range(n))] * n
+    assert gale_shapley_array(men_prefs, women_prefs).tolist() == list(range(n))
+    assert gale_shapley(men_prefs, women_prefs) == list(range(n))
@@ -0,0 +1,85 @@
+"""
+Gale-Shapley on NumPy arrays, for n in the tens of thousands.
+
+gale_shapley keeps the preferences and the n x n ranking table as nested lists of
+Python ints (about 36 bytes each instead of 4), and builds the ranking with a
+Python double loop. Here:
+- the preferences are int32 matrices: prefs[m, i] is the i-th choice of m;
+- the ranking is built with a single scatter, ranking[w, women_prefs[w]] = arange(n);
+- next_proposal and current are int32 arrays, and the proposals are made in rounds:
+  every free man proposes to his next woman at the same time, each woman keeps the
+  best of her proposers and her current partner, and the men she rejects are free
+  in the next round.
+
+Any order of the proposals leads to the same man-optimal stable matching, so the
+result is exactly the matching of gale_shapley. At n = 20,000 the three matrices take
+4.8 GB (1.6 GB each); women_prefs is only needed to build the ranking.
+"""
+
+import numpy as np
+
+
+def create_rankings_array(prefs):
+    """Return the int32 matrix ranking[w, m] = position of m in the preferences of w."""
+    prefs = np.asarray(prefs, dtype=np.int32)
+    n = prefs.shape[0]
+    ranking = np.empty((n, n), dtype=np.int32)
+    ranking[np.arange(n)[:, None], prefs] = np.arange(n, dtype=np.int32)
+    return ranking
+
+
+def gale_shapley_array(men_prefs, women_prefs=None, ranking=None):
+    """Man-optimal stable matching; returns the int32 array current[w] = man of w.
+
+    men_prefs and women_prefs are n x n matrices (or nested lists) of indices. The
+    women's ranking can be given instead of women_prefs (see create_rankings_array)."""
+    men_prefs = np.asarray(men_prefs, dtype=np.int32)
+    if ranking is None:
+        ranking = create_rankings_array(women_prefs)
+    n = men_prefs.shape[0]
+
+    next_proposal = np.zeros(n, dtype=np.int32)  # next woman to propose, for each man
+    current = np.full(n, -1, dtype=np.int32)     # -1 = not engaged
+    # Rank of the current partner of each woman (n = not engaged, worse than anyone)
+    current_rank = np.full(n, n, dtype=np.int32)
+    free_men = np.arange(n, dtype=np.int32)
+
+    while free_men.shape[0] > 0:
+        # Every free man proposes to the next woman on his list
+        women = men_prefs[free_men, next_proposal[free_men]]
+        next_proposal[free_men] += 1
+        ranks = ranking[women, free_men]
+
+        # Best proposer of each woman (ranks of different men are different)
+        best = current_rank.copy()
+        np.minimum.at(best, women, ranks)
+        accepted = ranks == best[women]
+        women, men = women[accepted], free_men[accepted]
+
+        # The partners they replace are free again, with the rejected proposers
+        dumped = current[women]
+        current[women] = men
+        current_rank[women] = best[women]
+        free_men = np.concatenate((free_men[~accepted], dumped[dumped >= 0]))
+
+    return current
+
+
+if __name__ == '__main__':
+    import time
+    from gale_shapley import gale_shapley
+
+    rng = np.random.default_rng(42)
+    for n in (1000, 5000, 20000):
+        men_prefs = rng.permuted(np.tile(np.arange(n, dtype=np.int32), (n, 1)), axis=1)
+        women_prefs = rng.permuted(np.tile(np.arange(n, dtype=np.int32), (n, 1)), axis=1)
+
+        start_time = time.perf_counter()
+        matches = gale_shapley_array(men_prefs, women_prefs)
+        print(f"--- {time.perf_counter() - start_time} seconds (arrays) for n = {n} ---")
+
+        if n <= 5000:
+            start_time = time.perf_counter()
+            expected = gale_shapley(men_prefs.tolist(), women_prefs.tolist())
+            print(f"--- {time.perf_counter() - start_time} seconds (gale_shapley) for n = {n} ---")
+            print("Same matching:", matches.tolist() == expected)